@@ -4,19 +4,77 @@ Hezkore's Twitch Chat to espeak-ng Bridge
 See README.md for connection and safety recommendations.
 """
 
+import ctypes
+import ctypes.util
+import errno
 import hashlib
-import obspython as obs
+import heapq
+import http.server
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
 import queue
+import random
+import runpy
+import selectors
+import shutil
+import signal
 import socket
 import subprocess
+import sys
 import threading
 import time
+import unicodedata
+import wave
+from array import array
+from collections import OrderedDict
 from typing import NamedTuple, Optional
 
+try:
+	import obspython as obs
+except ImportError:
+	# The speech process runs outside OBS; _run_speech_process installs a stand-in
+	obs = None
+
 SCRIPT_VERSION = "1.0.0"
 
-TWITCH_SERVER = "irc.chat.twitch.tv"
-TWITCH_PORT = 6667
+DEFAULT_TWITCH_SERVER = "irc.chat.twitch.tv"
+DEFAULT_TWITCH_PORT = 6667
+# host[:port] of another IRC server, e.g. tools/fake_twitch_server.py for offline testing
+IRC_SERVER_ENV = "TEXT2ESPEAK_IRC_SERVER"
+
+
+def _irc_server_from_env() -> tuple[str, int]:
+	# A bad override must not stop the script from loading; fall back to Twitch
+	value = os.environ.get(IRC_SERVER_ENV, "").strip()
+	if not value:
+		return DEFAULT_TWITCH_SERVER, DEFAULT_TWITCH_PORT
+	host, separator, port = value.partition(":")
+	try:
+		port_number = int(port) if separator else DEFAULT_TWITCH_PORT
+		if not host or not 0 < port_number < 65536:
+			raise ValueError
+	except ValueError:
+		if obs is not None:
+			obs.script_log(
+				obs.LOG_WARNING,
+				f"Ignoring {IRC_SERVER_ENV}={value!r}; expected host or host:port",
+			)
+		return DEFAULT_TWITCH_SERVER, DEFAULT_TWITCH_PORT
+	return host, port_number
+
+
+TWITCH_SERVER, TWITCH_PORT = _irc_server_from_env()
+CONNECT_TIMEOUT = 10.0
+RECV_BUFFER_SIZE = 65536
+DEFAULT_KEEPALIVE_INTERVAL = 30.0
+DEFAULT_KEEPALIVE_MISSED_PONGS = 2
+RECONNECT_FIRST_DELAY = 0.5
+RECONNECT_BASE_DELAY = 2.0
+RECONNECT_MAX_DELAY = 60.0
 
 DEFAULT_PITCH_MIN = 25
 DEFAULT_PITCH_MAX = 99
@@ -34,11 +92,447 @@ IMAGE_SOURCE_IDS = {
 	"slideshow",
 }
 
+ESPEAK_LIBRARY_NAMES = ("espeak-ng", "libespeak-ng.so.1")
+PULSE_SIMPLE_LIBRARY_NAMES = ("pulse-simple", "libpulse-simple.so.0")
+DEFAULT_VOICE = "en"
+DEFAULT_CACHE_MEMORY_MB = 16
+DEFAULT_CACHE_DISK_MB = 128
+DEFAULT_LOOKAHEAD_MESSAGES = 2
+COOLDOWN_TABLE_MAX_ENTRIES = 50000
+SANITIZE_TABLE_MAX_ENTRIES = 65536
+FILTER_RELOAD_CHECK_SECONDS = 2.0
+FILTER_FILE_TYPES = "Text files (*.txt);;All files (*.*)"
+MESSAGE_QUEUE_SIZE = 256
+
+PRIORITY_GREET = "greet"
+DEFAULT_GREET_BATCH_SECONDS = 5.0
+# Names read out in a combined greeting before the rest become "and N others"
+GREET_BATCH_NAMES = 3
+PRIORITY_PRIVILEGED = "privileged"
+PRIORITY_NORMAL = "normal"
+DEFAULT_PRIORITY_WEIGHTS = {
+	PRIORITY_GREET: 1.0,
+	PRIORITY_PRIVILEGED: 2.0,
+	PRIORITY_NORMAL: 1.0,
+}
+PRIVILEGED_BADGES = frozenset(("broadcaster", "moderator", "vip", "subscriber", "founder"))
+
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_RANDOM = "random"
+OVERFLOW_SUMMARIZE = "summarize"
+OVERFLOW_POLICIES = (
+	(OVERFLOW_DROP_NEWEST, "Drop new messages"),
+	(OVERFLOW_DROP_OLDEST, "Drop oldest messages"),
+	(OVERFLOW_RANDOM, "Keep a random sample"),
+	(OVERFLOW_SUMMARIZE, "Drop oldest and say how many were skipped"),
+)
+DROP_LOG_INTERVAL = 10.0
+
+ADAPTIVE_RISE_SECONDS = 2.0
+ADAPTIVE_RELAX_SECONDS = 10.0
+ADAPTIVE_RATE_STEP = 10
+
+BATCH_GAP_SECONDS = 0.35
+
+EVENT_POLL_SECONDS = 0.1
+
+METRICS_HOST = "127.0.0.1"
+METRICS_WRITE_SECONDS = 10.0
+METRICS_RING_SIZE = 2048
+METRICS_WINDOW_SECONDS = 300
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+HOTKEY_SKIP = "twitch_tts_skip_current"
+HOTKEY_FLUSH = "twitch_tts_flush_queue"
+CHILD_KILL_GRACE_SECONDS = 0.05
+SHUTDOWN_JOIN_SECONDS = 0.5
+CONFIG_APPLY_DELAY = 0.75
+
+SPEECH_PROCESS_RUN_NAME = "__text_2_espeak_speech_process__"
+SPEECH_PROCESS_JOIN_SECONDS = 2.0
+
+
+class VoiceProfile(NamedTuple):
+	# Zero rate and None pitch keep the configured speed and per-user pitch
+	voice: str = ""
+	rate: int = 0
+	pitch: Optional[int] = None
+
 
 class QueuedMessage(NamedTuple):
 	speak_text: str
 	pitch_value: int
 	display_text: str
+	user_key: str = ""
+	priority: str = PRIORITY_NORMAL
+	enqueued_at: float = 0.0
+	parts: tuple = ()
+	profile: Optional[VoiceProfile] = None
+	channel: str = ""
+	received_at: float = 0.0
+	dispatched_at: float = 0.0
+
+
+class _PcmAudio(NamedTuple):
+	samples: bytes
+	sample_rate: int
+
+
+class _MainEvent(NamedTuple):
+	kind: str
+	timestamp: float = 0.0
+	detail: object = None
+
+
+class _ExpiringMap:
+	"""Remembers when keys were last touched and forgets them after a timeout.
+
+	Entries are kept in touch order, so expired entries always sit at the
+	front and each call only pops entries that have actually expired, which
+	is O(1) amortized. A hard cap evicts the oldest entries first.
+	"""
+
+	def __init__(self, max_entries: int):
+		self._entries: "OrderedDict[str, float]" = OrderedDict()
+		self._max_entries = max_entries
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def _expire(self, timeout: float, now: float):
+		entries = self._entries
+		cutoff = now - timeout
+		while entries:
+			key, touched = next(iter(entries.items()))
+			if touched > cutoff:
+				break
+			del entries[key]
+
+	def touch(self, key: str, timeout: float, now: Optional[float] = None):
+		if timeout <= 0.0:
+			return
+		now = time.monotonic() if now is None else now
+		with self._lock:
+			self._expire(timeout, now)
+			self._entries[key] = now
+			self._entries.move_to_end(key)
+			while len(self._entries) > self._max_entries:
+				self._entries.popitem(last=False)
+
+	def is_active(self, key: str, timeout: float, now: Optional[float] = None) -> bool:
+		if timeout <= 0.0:
+			return False
+		now = time.monotonic() if now is None else now
+		with self._lock:
+			self._expire(timeout, now)
+			return key in self._entries
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+
+class _RateLimitedLog:
+	"""Logs a repeated warning at most once per interval, with a count of the rest."""
+
+	def __init__(self, interval: float):
+		self._interval = interval
+		self._last_time = -interval
+		self._suppressed = 0
+		self._lock = threading.Lock()
+
+	def warning(self, message: str):
+		now = time.monotonic()
+		with self._lock:
+			if now - self._last_time < self._interval:
+				self._suppressed += 1
+				return
+			suppressed = self._suppressed
+			self._suppressed = 0
+			self._last_time = now
+		if suppressed:
+			message = f"{message} ({suppressed} similar messages suppressed)"
+		obs.script_log(obs.LOG_WARNING, message)
+
+
+class _FairMessageScheduler:
+	"""Weighted fair queue of chat messages with one flow per user.
+
+	Every message gets a virtual finish time of max(virtual clock, the
+	user's previous finish) + 1 / weight, and messages are served in finish
+	order. A chatty user's messages drift behind everyone else's while a
+	quiet user's next message is served almost at once. The weight comes
+	from the message's priority class. A heap keeps enqueue and dequeue at
+	O(log n). The interface mirrors the parts of queue.Queue the script uses.
+	"""
+
+	def __init__(self, maxsize: int, weights: dict[str, float]):
+		self.maxsize = maxsize
+		self._weights = dict(weights)
+		self._heap: list[tuple[float, int, QueuedMessage]] = []
+		self._flow_finish: dict[str, float] = {}
+		self._flow_pending: dict[str, int] = {}
+		self._virtual_time = 0.0
+		self._sequence = itertools.count()
+		self._lock = threading.Lock()
+
+	def set_weights(self, weights: dict[str, float]):
+		with self._lock:
+			self._weights = dict(weights)
+
+	def weights(self) -> dict[str, float]:
+		with self._lock:
+			return dict(self._weights)
+
+	def qsize(self) -> int:
+		return len(self._heap)
+
+	def empty(self) -> bool:
+		return not self._heap
+
+	def put_nowait(self, message: QueuedMessage):
+		with self._lock:
+			if len(self._heap) >= self.maxsize:
+				raise queue.Full
+			flow = message.user_key
+			weight = max(0.01, self._weights.get(message.priority, 1.0))
+			start = max(self._virtual_time, self._flow_finish.get(flow, 0.0))
+			finish = start + 1.0 / weight
+			self._flow_finish[flow] = finish
+			self._flow_pending[flow] = self._flow_pending.get(flow, 0) + 1
+			heapq.heappush(self._heap, (finish, next(self._sequence), message))
+
+	def get_nowait(self) -> QueuedMessage:
+		with self._lock:
+			if not self._heap:
+				raise queue.Empty
+			finish, _, message = heapq.heappop(self._heap)
+			self._virtual_time = finish
+			# An idle flow restarts from the virtual clock next time
+			self._forget(message)
+			return message
+
+	def peek(self, count: int) -> list[QueuedMessage]:
+		with self._lock:
+			return [entry[2] for entry in heapq.nsmallest(count, self._heap)]
+
+	def get_if(self, predicate) -> Optional[QueuedMessage]:
+		# Dequeue the next message only if it matches; keeps the serving order
+		with self._lock:
+			if not self._heap or not predicate(self._heap[0][2]):
+				return None
+			finish, _, message = heapq.heappop(self._heap)
+			self._virtual_time = finish
+			self._forget(message)
+			return message
+
+	def oldest_enqueued_at(self) -> Optional[float]:
+		with self._lock:
+			if not self._heap:
+				return None
+			return min(entry[2].enqueued_at for entry in self._heap)
+
+	def drop_oldest(self) -> Optional[QueuedMessage]:
+		with self._lock:
+			if not self._heap:
+				return None
+			index = min(range(len(self._heap)), key=lambda position: self._heap[position][2].enqueued_at)
+			return self._remove_at(index)
+
+	def drop_random(self, rng: random.Random) -> Optional[QueuedMessage]:
+		with self._lock:
+			if not self._heap:
+				return None
+			return self._remove_at(rng.randrange(len(self._heap)))
+
+	def expire(self, cutoff: float) -> int:
+		# Remove every message enqueued before the cutoff
+		with self._lock:
+			kept = []
+			for entry in self._heap:
+				if entry[2].enqueued_at >= cutoff:
+					kept.append(entry)
+				else:
+					self._forget(entry[2])
+			expired = len(self._heap) - len(kept)
+			if expired:
+				heapq.heapify(kept)
+				self._heap = kept
+			return expired
+
+	def _remove_at(self, index: int) -> QueuedMessage:
+		entry = self._heap[index]
+		last = self._heap.pop()
+		if index < len(self._heap):
+			self._heap[index] = last
+			heapq.heapify(self._heap)
+		self._forget(entry[2])
+		return entry[2]
+
+	def _forget(self, message: QueuedMessage):
+		# Dropped messages give their flow's slot back
+		flow = message.user_key
+		pending = self._flow_pending.get(flow, 1) - 1
+		if pending <= 0:
+			self._flow_pending.pop(flow, None)
+			self._flow_finish.pop(flow, None)
+		else:
+			self._flow_pending[flow] = pending
+
+	def clear(self):
+		with self._lock:
+			self._heap = []
+			self._flow_finish.clear()
+			self._flow_pending.clear()
+			self._virtual_time = 0.0
+
+
+class _ChannelMessageScheduler:
+	"""One _FairMessageScheduler per channel, all feeding a single speech output.
+
+	Each channel has its own queue and capacity. Channels take turns by start
+	tag: the busiest channel gets one slot per round like every other
+	non-empty channel, and a channel that was idle rejoins at the current
+	virtual clock instead of cashing in the turns it missed. The interface
+	matches _FairMessageScheduler, with an optional channel for the calls
+	that shed load.
+	"""
+
+	def __init__(self, maxsize: int, weights: dict[str, float]):
+		self.maxsize = maxsize
+		self._weights = dict(weights)
+		self._queues: dict[str, _FairMessageScheduler] = {}
+		self._start_tags: dict[str, float] = {}
+		self._virtual_time = 0.0
+		self._lock = threading.Lock()
+
+	def set_weights(self, weights: dict[str, float]):
+		with self._lock:
+			self._weights = dict(weights)
+			for channel_queue in self._queues.values():
+				channel_queue.set_weights(weights)
+
+	def weights(self) -> dict[str, float]:
+		with self._lock:
+			return dict(self._weights)
+
+	def qsize(self, channel: Optional[str] = None) -> int:
+		if channel is not None:
+			channel_queue = self._queues.get(channel)
+			return 0 if channel_queue is None else channel_queue.qsize()
+		return sum(channel_queue.qsize() for channel_queue in list(self._queues.values()))
+
+	def empty(self) -> bool:
+		return all(channel_queue.empty() for channel_queue in list(self._queues.values()))
+
+	def put_nowait(self, message: QueuedMessage):
+		with self._lock:
+			channel = message.channel
+			channel_queue = self._queues.get(channel)
+			if channel_queue is None:
+				channel_queue = _FairMessageScheduler(self.maxsize, self._weights)
+				self._queues[channel] = channel_queue
+			if channel_queue.empty():
+				self._start_tags[channel] = max(self._start_tags.get(channel, 0.0), self._virtual_time)
+			channel_queue.put_nowait(message)
+
+	def get_nowait(self) -> QueuedMessage:
+		with self._lock:
+			channel = self._next_channel()
+			if channel is None:
+				raise queue.Empty
+			message = self._queues[channel].get_nowait()
+			self._served(channel)
+			return message
+
+	def peek(self, count: int) -> list[QueuedMessage]:
+		# Replays the turn order without serving anything
+		with self._lock:
+			heads = {
+				channel: channel_queue.peek(count)
+				for channel, channel_queue in self._queues.items()
+				if not channel_queue.empty()
+			}
+			tags = {channel: self._start_tags[channel] for channel in heads}
+			upcoming = []
+			while heads and len(upcoming) < count:
+				channel = min(tags, key=tags.get)
+				upcoming.append(heads[channel].pop(0))
+				tags[channel] += 1.0
+				if not heads[channel]:
+					del heads[channel]
+					del tags[channel]
+			return upcoming
+
+	def get_if(self, predicate) -> Optional[QueuedMessage]:
+		with self._lock:
+			channel = self._next_channel()
+			if channel is None:
+				return None
+			message = self._queues[channel].get_if(predicate)
+			if message is not None:
+				self._served(channel)
+			return message
+
+	def oldest_enqueued_at(self) -> Optional[float]:
+		with self._lock:
+			oldest = [channel_queue.oldest_enqueued_at() for channel_queue in self._queues.values()]
+		oldest = [enqueued_at for enqueued_at in oldest if enqueued_at is not None]
+		return min(oldest) if oldest else None
+
+	def drop_oldest(self, channel: Optional[str] = None) -> Optional[QueuedMessage]:
+		with self._lock:
+			if channel is None:
+				candidates = [
+					(channel_queue.oldest_enqueued_at(), name)
+					for name, channel_queue in self._queues.items()
+					if not channel_queue.empty()
+				]
+				if not candidates:
+					return None
+				channel = min(candidates)[1]
+			channel_queue = self._queues.get(channel)
+			return None if channel_queue is None else channel_queue.drop_oldest()
+
+	def drop_random(self, rng: random.Random, channel: Optional[str] = None) -> Optional[QueuedMessage]:
+		with self._lock:
+			if channel is not None:
+				channel_queue = self._queues.get(channel)
+				return None if channel_queue is None else channel_queue.drop_random(rng)
+
+			# Every queued message is equally likely, whichever channel it is in
+			sizes = [(name, channel_queue.qsize()) for name, channel_queue in self._queues.items()]
+			total = sum(size for _, size in sizes)
+			if total == 0:
+				return None
+			index = rng.randrange(total)
+			for name, size in sizes:
+				if index < size:
+					return self._queues[name].drop_random(rng)
+				index -= size
+			return None
+
+	def expire(self, cutoff: float) -> int:
+		with self._lock:
+			return sum(channel_queue.expire(cutoff) for channel_queue in self._queues.values())
+
+	def clear(self):
+		with self._lock:
+			self._queues.clear()
+			self._start_tags.clear()
+			self._virtual_time = 0.0
+
+	def _next_channel(self) -> Optional[str]:
+		active = [name for name, channel_queue in self._queues.items() if not channel_queue.empty()]
+		if not active:
+			return None
+		return min(active, key=self._start_tags.__getitem__)
+
+	def _served(self, channel: str):
+		self._virtual_time = self._start_tags[channel]
+		self._start_tags[channel] += 1.0
 
 # Global Settings Managed Through The OBS UI
 oauth_token: str = ""
@@ -58,40 +552,129 @@ per_user_timeout: float = 0.5
 greet_users: bool = False
 greet_message: str = "Welcome {name}"
 greet_timeout_minutes: float = 10.0
-
-_CONFIG_PROPERTY_NAMES = (
+greet_batch_seconds: float = DEFAULT_GREET_BATCH_SECONDS
+overflow_policy: str = OVERFLOW_DROP_NEWEST
+max_speech_latency: float = 0.0
+adaptive_speed: bool = False
+adaptive_max_rate: int = 250
+adaptive_min_interval: float = 0.5
+adaptive_target_seconds: float = 30.0
+batch_short_messages: bool = False
+batch_backlog_threshold: int = 6
+batch_max_messages: int = 4
+batch_max_characters: int = 32
+cache_memory_mb: int = DEFAULT_CACHE_MEMORY_MB
+cache_disk_mb: int = DEFAULT_CACHE_DISK_MB
+lookahead_messages: int = DEFAULT_LOOKAHEAD_MESSAGES
+use_child_process: bool = False
+transliterate_text: bool = True
+trigger_profiles: str = ""
+keepalive_interval: float = DEFAULT_KEEPALIVE_INTERVAL
+keepalive_missed_pongs: int = DEFAULT_KEEPALIVE_MISSED_PONGS
+metrics_port: int = 0
+metrics_file: str = ""
+blocklist_file: str = ""
+replacements_file: str = ""
+
+# Config keys that only take effect on a new connection (or, for
+# use_child_process, a new pipeline); every other key is read live by the
+# chat and speech threads and is applied without reconnecting. "channel"
+# holds only the channel names; their trigger words are "channel_triggers".
+_CONNECTION_CONFIG_KEYS = frozenset((
+	"oauth_token",
+	"nickname",
 	"channel",
+	"use_child_process",
+))
+
+# Settings greyed out while the reader is enabled. The channel field stays
+# editable so per-channel trigger words can change live; editing the channel
+# names in it reconnects like any other connection key.
+_CONNECTION_PROPERTY_NAMES = ("oauth_token", "nickname", "use_child_process")
+
+# Module globals copied into the speech process; everything it needs to run alone
+_SPEECH_PROCESS_SETTINGS = (
+	"TWITCH_SERVER",
+	"TWITCH_PORT",
+	"oauth_token",
 	"nickname",
+	"channel",
 	"trigger_word",
-	"oauth_token",
 	"speech_rate",
 	"speak_interval",
-	"per_user_timeout",
-	"greet_users",
-	"greet_message",
-	"greet_timeout_minutes",
 	"include_username",
 	"max_tts_length",
 	"pitch_min",
 	"pitch_max",
 	"text_source_name",
 	"image_source_name",
+	"per_user_timeout",
+	"greet_users",
+	"greet_message",
+	"greet_timeout_minutes",
+	"greet_batch_seconds",
+	"overflow_policy",
+	"max_speech_latency",
+	"adaptive_speed",
+	"adaptive_max_rate",
+	"adaptive_min_interval",
+	"adaptive_target_seconds",
+	"batch_short_messages",
+	"batch_backlog_threshold",
+	"batch_max_messages",
+	"batch_max_characters",
+	"cache_memory_mb",
+	"cache_disk_mb",
+	"lookahead_messages",
+	"transliterate_text",
+	"trigger_profiles",
+	"keepalive_interval",
+	"keepalive_missed_pongs",
+	"metrics_port",
+	"metrics_file",
+	"blocklist_file",
+	"replacements_file",
 )
 
 # Runtime State
-_message_queue: "queue.Queue[QueuedMessage]" = queue.Queue(maxsize=256)
+_message_queue = _ChannelMessageScheduler(MESSAGE_QUEUE_SIZE, DEFAULT_PRIORITY_WEIGHTS)
+# One log per kind of loss so they neither suppress nor miscount each other
+_reject_log = _RateLimitedLog(DROP_LOG_INTERVAL)
+_shed_log = _RateLimitedLog(DROP_LOG_INTERVAL)
+_expire_log = _RateLimitedLog(DROP_LOG_INTERVAL)
+_shed_random = random.Random()
+_skipped_since_spoken: int = 0
+_average_speech_work: float = 0.0
+_last_speech_duration: float = 0.0
+_adaptive_level: float = 0.0
+_adaptive_updated: float = 0.0
 _chat_thread: Optional[threading.Thread] = None
 _stop_event = threading.Event()
-_chat_socket: Optional[socket.socket] = None
-_tts_thread: Optional[threading.Thread] = None
+_chat_wakeup: Optional[tuple[socket.socket, socket.socket]] = None
+_chat_connection = None
+_tts_engine = None
+_tts_engine_lock = threading.Lock()
+# Held while script_update publishes settings and while a worker thread
+# handles one unit of work (a batch of chat lines, one message's synthesis
+# parameters), so no worker mixes old and new values of related settings
+_settings_lock = threading.RLock()
+_audio_cache = None
+_prefetch_thread: Optional[threading.Thread] = None
+_prefetch_condition = threading.Condition()
+_prefetch_requested: bool = False
+_prefetch_stopping: bool = False
+_prerendered: "OrderedDict[str, _PcmAudio]" = OrderedDict()
+_prerendered_lock = threading.Lock()
 _last_speech_time: float = 0.0
 _current_config: Optional[dict] = None
 _pending_config: Optional[dict] = None
 _pending_apply_time: float = 0.0
 _pending_force: bool = False
+_main_events: "queue.SimpleQueue[_MainEvent]" = queue.SimpleQueue()
+_next_deadline: float = 0.0
+_scheduler_interval_ms: int = 0
+_hotkey_ids: dict[str, int] = {}
 _display_visible: bool = False
-_user_last_trigger: dict[str, float] = {}
-_user_last_greet: dict[str, float] = {}
 
 
 def script_description() -> str:
@@ -111,6 +694,17 @@ def script_defaults(settings):
 	obs.obs_data_set_default_bool(settings, "greet_users", greet_users)
 	obs.obs_data_set_default_string(settings, "greet_message", greet_message)
 	obs.obs_data_set_default_double(settings, "greet_timeout_minutes", greet_timeout_minutes)
+	obs.obs_data_set_default_double(settings, "greet_batch_seconds", greet_batch_seconds)
+	obs.obs_data_set_default_string(settings, "overflow_policy", OVERFLOW_DROP_NEWEST)
+	obs.obs_data_set_default_double(settings, "max_speech_latency", 0.0)
+	obs.obs_data_set_default_bool(settings, "adaptive_speed", adaptive_speed)
+	obs.obs_data_set_default_int(settings, "adaptive_max_rate", adaptive_max_rate)
+	obs.obs_data_set_default_double(settings, "adaptive_min_interval", adaptive_min_interval)
+	obs.obs_data_set_default_double(settings, "adaptive_target_seconds", adaptive_target_seconds)
+	obs.obs_data_set_default_bool(settings, "batch_short_messages", batch_short_messages)
+	obs.obs_data_set_default_int(settings, "batch_backlog_threshold", batch_backlog_threshold)
+	obs.obs_data_set_default_int(settings, "batch_max_messages", batch_max_messages)
+	obs.obs_data_set_default_int(settings, "batch_max_characters", batch_max_characters)
 	obs.obs_data_set_default_int(settings, "speech_rate", speech_rate)
 	obs.obs_data_set_default_double(settings, "speak_interval", speak_interval)
 	obs.obs_data_set_default_bool(settings, "include_username", include_username)
@@ -120,6 +714,20 @@ def script_defaults(settings):
 	obs.obs_data_set_default_int(settings, "pitch_max", DEFAULT_PITCH_MAX)
 	obs.obs_data_set_default_string(settings, "text_source_name", "")
 	obs.obs_data_set_default_string(settings, "image_source_name", "")
+	obs.obs_data_set_default_int(settings, "cache_memory_mb", DEFAULT_CACHE_MEMORY_MB)
+	obs.obs_data_set_default_int(settings, "cache_disk_mb", DEFAULT_CACHE_DISK_MB)
+	obs.obs_data_set_default_int(settings, "lookahead_messages", DEFAULT_LOOKAHEAD_MESSAGES)
+	obs.obs_data_set_default_bool(settings, "use_child_process", False)
+	obs.obs_data_set_default_bool(settings, "transliterate_text", transliterate_text)
+	obs.obs_data_set_default_string(settings, "trigger_profiles", "")
+	obs.obs_data_set_default_double(settings, "keepalive_interval", DEFAULT_KEEPALIVE_INTERVAL)
+	obs.obs_data_set_default_int(settings, "keepalive_missed_pongs", DEFAULT_KEEPALIVE_MISSED_PONGS)
+	obs.obs_data_set_default_int(settings, "metrics_port", 0)
+	obs.obs_data_set_default_string(settings, "metrics_file", "")
+	obs.obs_data_set_default_string(settings, "blocklist_file", "")
+	obs.obs_data_set_default_string(settings, "replacements_file", "")
+	for priority, weight in DEFAULT_PRIORITY_WEIGHTS.items():
+		obs.obs_data_set_default_double(settings, f"priority_weight_{priority}", weight)
 
 
 def script_properties():
@@ -134,7 +742,7 @@ def script_properties():
 	obs.obs_properties_add_text(
 		props,
 		"channel",
-		"Twitch channel (#name)",
+		"Twitch channels (#name, optionally followed by its own trigger word; separate with commas)",
 		obs.OBS_TEXT_DEFAULT,
 	)
 	obs.obs_properties_add_text(
@@ -149,6 +757,12 @@ def script_properties():
 		"Trigger word",
 		obs.OBS_TEXT_DEFAULT,
 	)
+	obs.obs_properties_add_text(
+		props,
+		"trigger_profiles",
+		"Voice triggers (one per line, e.g. !robot = voice=en+m3 rate=200 pitch=20)",
+		obs.OBS_TEXT_MULTILINE,
+	)
 	obs.obs_properties_add_text(
 		props,
 		"oauth_token",
@@ -199,11 +813,35 @@ def script_properties():
 		720.0,
 		0.5,
 	)
+	obs.obs_properties_add_float(
+		props,
+		"greet_batch_seconds",
+		"Combine greetings for joins within (seconds, 0 = greet each)",
+		0.0,
+		60.0,
+		0.5,
+	)
 	obs.obs_properties_add_bool(
 		props,
 		"include_username",
 		"Prefix chat messages with username",
 	)
+	obs.obs_properties_add_path(
+		props,
+		"blocklist_file",
+		"Blocked words file",
+		obs.OBS_PATH_FILE,
+		FILTER_FILE_TYPES,
+		None,
+	)
+	obs.obs_properties_add_path(
+		props,
+		"replacements_file",
+		"Pronunciation replacements file",
+		obs.OBS_PATH_FILE,
+		FILTER_FILE_TYPES,
+		None,
+	)
 	obs.obs_properties_add_int(
 		props,
 		"max_tts_length",
@@ -249,54 +887,213 @@ def script_properties():
 	obs.obs_property_list_add_string(image_prop, "(None)", "")
 	_populate_source_list(image_prop, IMAGE_SOURCE_IDS)
 
+	overflow_prop = obs.obs_properties_add_list(
+		props,
+		"overflow_policy",
+		"When the queue backs up",
+		obs.OBS_COMBO_TYPE_LIST,
+		obs.OBS_COMBO_FORMAT_STRING,
+	)
+	for value, label in OVERFLOW_POLICIES:
+		obs.obs_property_list_add_string(overflow_prop, label, value)
+	obs.obs_properties_add_float(
+		props,
+		"max_speech_latency",
+		"Max seconds a message may wait (0 = no limit)",
+		0.0,
+		600.0,
+		5.0,
+	)
+	obs.obs_properties_add_bool(
+		props,
+		"adaptive_speed",
+		"Speak faster while the queue is backed up",
+	)
+	obs.obs_properties_add_int(
+		props,
+		"adaptive_max_rate",
+		"Fastest espeak-ng speed when backed up",
+		80,
+		450,
+		10,
+	)
+	obs.obs_properties_add_float(
+		props,
+		"adaptive_min_interval",
+		"Shortest seconds between messages when backed up",
+		0.0,
+		10.0,
+		0.25,
+	)
+	obs.obs_properties_add_float(
+		props,
+		"adaptive_target_seconds",
+		"Backlog (seconds) that triggers full speed",
+		5.0,
+		600.0,
+		5.0,
+	)
+	obs.obs_properties_add_bool(
+		props,
+		"batch_short_messages",
+		"Read short messages together when backed up",
+	)
+	obs.obs_properties_add_int(
+		props,
+		"batch_backlog_threshold",
+		"Queued messages before short ones are combined",
+		2,
+		256,
+		1,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"batch_max_messages",
+		"Most messages read together",
+		2,
+		10,
+		1,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"batch_max_characters",
+		"Longest message (characters) that counts as short",
+		5,
+		100,
+		1,
+	)
+	obs.obs_properties_add_button(
+		props,
+		"log_adaptive_status",
+		"Log speech speed status",
+		_on_log_adaptive_status_clicked,
+	)
+	obs.obs_properties_add_float(
+		props,
+		f"priority_weight_{PRIORITY_NORMAL}",
+		"Queue share: chatters",
+		0.1,
+		10.0,
+		0.1,
+	)
+	obs.obs_properties_add_float(
+		props,
+		f"priority_weight_{PRIORITY_PRIVILEGED}",
+		"Queue share: subscribers, VIPs and mods",
+		0.1,
+		10.0,
+		0.1,
+	)
+	obs.obs_properties_add_float(
+		props,
+		f"priority_weight_{PRIORITY_GREET}",
+		"Queue share: greetings",
+		0.1,
+		10.0,
+		0.1,
+	)
+
+	obs.obs_properties_add_int(
+		props,
+		"cache_memory_mb",
+		"Speech cache in memory (MB)",
+		0,
+		512,
+		4,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"cache_disk_mb",
+		"Speech cache on disk (MB)",
+		0,
+		4096,
+		32,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"lookahead_messages",
+		"Pre-synthesize queued messages",
+		0,
+		4,
+		1,
+	)
+	obs.obs_properties_add_button(
+		props,
+		"log_cache_stats",
+		"Log speech cache statistics",
+		_on_log_cache_stats_clicked,
+	)
+	obs.obs_properties_add_bool(
+		props,
+		"transliterate_text",
+		"Read accented and other non-ASCII letters (é as e, ß as ss)",
+	)
+	obs.obs_properties_add_float(
+		props,
+		"keepalive_interval",
+		"Seconds between connection checks (PING)",
+		5.0,
+		300.0,
+		5.0,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"keepalive_missed_pongs",
+		"Unanswered checks before reconnecting",
+		1,
+		10,
+		1,
+	)
+	obs.obs_properties_add_button(
+		props,
+		"log_connection_status",
+		"Log chat connection status",
+		_on_log_connection_status_clicked,
+	)
+	obs.obs_properties_add_int(
+		props,
+		"metrics_port",
+		"Metrics HTTP port on localhost (0 = off)",
+		0,
+		65535,
+		1,
+	)
+	obs.obs_properties_add_path(
+		props,
+		"metrics_file",
+		"Metrics JSON file (rewritten every 10 seconds)",
+		obs.OBS_PATH_FILE_SAVE,
+		"JSON files (*.json)",
+		None,
+	)
+	obs.obs_properties_add_bool(
+		props,
+		"use_child_process",
+		"Run chat reader and speech in a separate process",
+	)
+
 	_set_config_properties_enabled(props, not enabled)
 	return props
 
 
 def script_update(settings):
-	global oauth_token, nickname, channel, speech_rate, speak_interval
-	global include_username, max_tts_length, enabled, pitch_min, pitch_max
-	global text_source_name, image_source_name, _display_visible, trigger_word
-	global per_user_timeout, greet_users, greet_message, greet_timeout_minutes
-	global _current_config, _pending_config, _pending_apply_time, _pending_force
+	global _display_visible, _pending_config, _pending_apply_time, _pending_force
 
 	prev_enabled = enabled
 	prev_text_source = text_source_name
 	prev_image_source = image_source_name
-	oauth_token = obs.obs_data_get_string(settings, "oauth_token").strip()
-	nickname = obs.obs_data_get_string(settings, "nickname").strip() or "justinfan12345"
-	channel = obs.obs_data_get_string(settings, "channel").strip()
-	if channel and not channel.startswith("#"):
-		channel = f"#{channel}"
-	trigger_word = obs.obs_data_get_string(settings, "trigger_word").strip()
-	per_user_timeout = max(0.0, obs.obs_data_get_double(settings, "per_user_timeout") or 0.0)
-	greet_users = obs.obs_data_get_bool(settings, "greet_users")
-	greet_message = obs.obs_data_get_string(settings, "greet_message").strip() or "Welcome {name}"
-	greet_timeout_minutes = max(0.0, obs.obs_data_get_double(settings, "greet_timeout_minutes") or 0.0)
-	speech_rate = obs.obs_data_get_int(settings, "speech_rate") or 150
-	speak_interval = max(0.5, obs.obs_data_get_double(settings, "speak_interval") or 2.0)
-	include_username = obs.obs_data_get_bool(settings, "include_username")
-	max_tts_length = obs.obs_data_get_int(settings, "max_tts_length") or 280
-	enabled = obs.obs_data_get_bool(settings, "enabled")
-	pitch_min_value = obs.obs_data_get_int(settings, "pitch_min")
-	pitch_max_value = obs.obs_data_get_int(settings, "pitch_max")
-	text_source_name = obs.obs_data_get_string(settings, "text_source_name").strip()
-	image_source_name = obs.obs_data_get_string(settings, "image_source_name").strip()
-
-	if pitch_min_value == 0 and not obs.obs_data_has_user_value(settings, "pitch_min"):
-		pitch_min_value = DEFAULT_PITCH_MIN
-	if pitch_max_value == 0 and not obs.obs_data_has_user_value(settings, "pitch_max"):
-		pitch_max_value = DEFAULT_PITCH_MAX
-
-	pitch_min = pitch_min_value
-	pitch_max = pitch_max_value
-
-	if pitch_min < 0:
-		pitch_min = 0
-	if pitch_max < 0:
-		pitch_max = 0
-	if pitch_max < pitch_min:
-		pitch_max = pitch_min
+	values = _read_settings(settings)
+	# Publish every setting at once; worker threads read them under the same lock
+	with _settings_lock:
+		globals().update(values)
+	_configure_audio_cache()
+	_configure_metrics()
+	_configure_sanitizer()
+	_configure_text_filter()
+	_message_queue.set_weights({
+		priority: obs.obs_data_get_double(settings, f"priority_weight_{priority}") or default_weight
+		for priority, default_weight in DEFAULT_PRIORITY_WEIGHTS.items()
+	})
 
 	if prev_text_source and prev_text_source != text_source_name:
 		_apply_visibility_to_source(prev_text_source, False)
@@ -305,11 +1102,15 @@ def script_update(settings):
 	if (prev_text_source != text_source_name) or (prev_image_source != image_source_name):
 		_display_visible = False
 
+	# Channels, trigger words and the speech process pick these up once the
+	# edit settles (see _apply_config), not on every keystroke
 	new_config = {
 		"oauth_token": oauth_token,
 		"nickname": nickname,
-		"channel": channel,
-	"trigger_word": trigger_word,
+		"channel": ", ".join(name for name, _ in _parse_channel_list(channel)),
+		"channel_triggers": channel,
+		"trigger_word": trigger_word,
+		"trigger_profiles": trigger_profiles,
 		"speech_rate": speech_rate,
 		"speak_interval": speak_interval,
 		"include_username": include_username,
@@ -320,26 +1121,192 @@ def script_update(settings):
 		"greet_users": greet_users,
 		"greet_message": greet_message,
 		"greet_timeout_minutes": greet_timeout_minutes,
+		"greet_batch_seconds": greet_batch_seconds,
+		"use_child_process": use_child_process,
 	}
 	_pending_config = new_config
 	_pending_apply_time = time.time()
 	_pending_force = prev_enabled != enabled
+	_reschedule_now()
+
+
+def _read_settings(settings) -> dict:
+	# Every setting-backed module global, keyed by its name
+	unseparated_channels = []
+	channel_entries = _parse_channel_list(obs.obs_data_get_string(settings, "channel"), unseparated_channels)
+
+	pitch_min_value = obs.obs_data_get_int(settings, "pitch_min")
+	pitch_max_value = obs.obs_data_get_int(settings, "pitch_max")
+	if pitch_min_value == 0 and not obs.obs_data_has_user_value(settings, "pitch_min"):
+		pitch_min_value = DEFAULT_PITCH_MIN
+	if pitch_max_value == 0 and not obs.obs_data_has_user_value(settings, "pitch_max"):
+		pitch_max_value = DEFAULT_PITCH_MAX
+	pitch_min_value = max(0, pitch_min_value)
+	pitch_max_value = max(pitch_min_value, pitch_max_value)
+
+	return {
+		"oauth_token": obs.obs_data_get_string(settings, "oauth_token").strip(),
+		"nickname": obs.obs_data_get_string(settings, "nickname").strip() or "justinfan12345",
+		"channel": ", ".join(" ".join(entry).strip() for entry in channel_entries),
+		"_unseparated_channels": tuple(unseparated_channels),
+		"trigger_word": obs.obs_data_get_string(settings, "trigger_word").strip(),
+		"trigger_profiles": obs.obs_data_get_string(settings, "trigger_profiles"),
+		"per_user_timeout": max(0.0, obs.obs_data_get_double(settings, "per_user_timeout") or 0.0),
+		"keepalive_interval": max(
+			5.0, obs.obs_data_get_double(settings, "keepalive_interval") or DEFAULT_KEEPALIVE_INTERVAL
+		),
+		"keepalive_missed_pongs": max(1, obs.obs_data_get_int(settings, "keepalive_missed_pongs")),
+		"metrics_port": max(0, obs.obs_data_get_int(settings, "metrics_port")),
+		"metrics_file": obs.obs_data_get_string(settings, "metrics_file").strip(),
+		"greet_users": obs.obs_data_get_bool(settings, "greet_users"),
+		"greet_message": obs.obs_data_get_string(settings, "greet_message").strip() or "Welcome {name}",
+		"greet_timeout_minutes": max(0.0, obs.obs_data_get_double(settings, "greet_timeout_minutes") or 0.0),
+		"greet_batch_seconds": max(0.0, obs.obs_data_get_double(settings, "greet_batch_seconds")),
+		"speech_rate": obs.obs_data_get_int(settings, "speech_rate") or 150,
+		"speak_interval": max(0.5, obs.obs_data_get_double(settings, "speak_interval") or 2.0),
+		"include_username": obs.obs_data_get_bool(settings, "include_username"),
+		"max_tts_length": obs.obs_data_get_int(settings, "max_tts_length") or 280,
+		"enabled": obs.obs_data_get_bool(settings, "enabled"),
+		"pitch_min": pitch_min_value,
+		"pitch_max": pitch_max_value,
+		"text_source_name": obs.obs_data_get_string(settings, "text_source_name").strip(),
+		"image_source_name": obs.obs_data_get_string(settings, "image_source_name").strip(),
+		"cache_memory_mb": max(0, obs.obs_data_get_int(settings, "cache_memory_mb")),
+		"cache_disk_mb": max(0, obs.obs_data_get_int(settings, "cache_disk_mb")),
+		"lookahead_messages": max(0, obs.obs_data_get_int(settings, "lookahead_messages")),
+		"overflow_policy": obs.obs_data_get_string(settings, "overflow_policy") or OVERFLOW_DROP_NEWEST,
+		"max_speech_latency": max(0.0, obs.obs_data_get_double(settings, "max_speech_latency") or 0.0),
+		"adaptive_speed": obs.obs_data_get_bool(settings, "adaptive_speed"),
+		"adaptive_max_rate": obs.obs_data_get_int(settings, "adaptive_max_rate") or 250,
+		"adaptive_min_interval": max(0.0, obs.obs_data_get_double(settings, "adaptive_min_interval")),
+		"adaptive_target_seconds": max(5.0, obs.obs_data_get_double(settings, "adaptive_target_seconds") or 30.0),
+		"batch_short_messages": obs.obs_data_get_bool(settings, "batch_short_messages"),
+		"batch_backlog_threshold": max(2, obs.obs_data_get_int(settings, "batch_backlog_threshold")),
+		"batch_max_messages": max(2, obs.obs_data_get_int(settings, "batch_max_messages")),
+		"batch_max_characters": max(1, obs.obs_data_get_int(settings, "batch_max_characters")),
+		"use_child_process": obs.obs_data_get_bool(settings, "use_child_process"),
+		"transliterate_text": obs.obs_data_get_bool(settings, "transliterate_text"),
+		"blocklist_file": obs.obs_data_get_string(settings, "blocklist_file").strip(),
+		"replacements_file": obs.obs_data_get_string(settings, "replacements_file").strip(),
+	}
 
 
 def script_load(settings):
+	obs.obs_frontend_add_event_callback(_on_frontend_event)
+	obs.signal_handler_connect(obs.obs_get_signal_handler(), "source_rename", _on_scene_items_changed)
 	script_update(settings)
+	_register_hotkeys(settings)
+	_arm_scheduler(0.0)
 
 
 def script_unload():
+	_stop_scheduler()
+	_unregister_hotkeys()
+	_metrics_exporter.stop()
+	# Kill synthesis/playback children first so nothing below waits on audio
+	_process_supervisor.terminate(_process_supervisor.ALL)
 	stop_chat_thread()
 	stop_tts_thread()
+	_process_supervisor.terminate(_process_supervisor.ALL)
+	_shutdown_tts_engine()
 	_set_display_visibility(False)
+	obs.signal_handler_disconnect(obs.obs_get_signal_handler(), "source_rename", _on_scene_items_changed)
+	obs.obs_frontend_remove_event_callback(_on_frontend_event)
+	_scene_item_index.release()
+
+
+def _scheduler_tick():
+	_speech_process.pump()
+	_arm_scheduler(_run_main_work())
+
+
+def _run_main_work() -> float:
+	# Main-thread work runs here, only when an event arrived or a deadline passed.
+	# Returns the seconds until the next deadline.
+	global _next_deadline
+
+	woken = False
+	while True:
+		try:
+			event = _main_events.get_nowait()
+		except queue.Empty:
+			break
+		_handle_main_event(event)
+		woken = True
+
+	now = time.time()
+	if woken or now >= _next_deadline:
+		_maybe_apply_config()
+		if not _speech_process.running:
+			_maybe_reload_text_filter(now)
+			dispatch_tts()
+			_update_display_visibility_after_tts()
+		_next_deadline = _compute_next_deadline(now)
+
+	return _next_deadline - now
+
+
+def _compute_next_deadline(now: float) -> float:
+	# Earliest moment main-thread work could be due; worker events arrive in between
+	deadline = now + EVENT_POLL_SECONDS
+	if _pending_config is not None:
+		deadline = min(deadline, _pending_apply_time + _pending_config_delay())
+	if enabled and not _message_queue.empty() and not _is_speaking():
+		deadline = min(deadline, _last_speech_time + _effective_speak_interval())
+	return deadline
+
+
+def _arm_scheduler(delay: float):
+	# OBS timers repeat, so the timer is only replaced when its interval changes
+	global _scheduler_interval_ms
+
+	interval_ms = max(1, int(min(delay, EVENT_POLL_SECONDS) * 1000.0))
+	if interval_ms == _scheduler_interval_ms:
+		return
+	if _scheduler_interval_ms:
+		obs.timer_remove(_scheduler_tick)
+	obs.timer_add(_scheduler_tick, interval_ms)
+	_scheduler_interval_ms = interval_ms
+
+
+def _stop_scheduler():
+	global _scheduler_interval_ms
+
+	if _scheduler_interval_ms:
+		obs.timer_remove(_scheduler_tick)
+		_scheduler_interval_ms = 0
+
+
+def _reschedule_now():
+	global _next_deadline
+
+	_next_deadline = 0.0
+	if _scheduler_interval_ms:
+		_arm_scheduler(0.0)
+
+
+def _post_main_event(kind: str, timestamp: float = 0.0, detail: object = None):
+	# Worker threads cannot arm OBS timers, so they leave an event for the next wakeup
+	_main_events.put(_MainEvent(kind, timestamp, detail))
+
 
+def _handle_main_event(event: _MainEvent):
+	global _average_speech_work, _last_speech_duration
 
-def script_tick(seconds):
-	_maybe_apply_config()
-	dispatch_tts()
-	_update_display_visibility_after_tts()
+	if event.kind != "tts_finished":
+		return
+
+	started, rate, part_count, completed = event.detail
+	if not completed:
+		# A skipped or failed message says nothing about how long speech takes
+		return
+	_last_speech_duration = event.timestamp - started
+	# Speech time scales with 1 / rate, so average seconds * rate instead
+	work = _last_speech_duration * rate / max(1, part_count)
+	if _average_speech_work <= 0.0:
+		_average_speech_work = work
+	else:
+		_average_speech_work += 0.2 * (work - _average_speech_work)
 
 
 def restart_chat_thread():
@@ -354,193 +1321,1179 @@ def restart_chat_thread():
 
 def start_chat_thread():
 	# Launch the Twitch IRC worker thread if chat playback is enabled
-	global _chat_thread
+	global _chat_thread, _chat_wakeup
 
 	if not enabled:
 		return
 
-	if not channel:
+	if not _channels:
 		obs.script_log(obs.LOG_WARNING, "Twitch channel is not set; skipping connect.")
 		return
 
+	if use_child_process:
+		_speech_process.start(_speech_process_settings())
+		return
+
 	_stop_event.clear()
-	_chat_thread = threading.Thread(target=_chat_worker, name="TwitchChatThread", daemon=True)
+	_chat_wakeup = socket.socketpair()
+	for wakeup_socket in _chat_wakeup:
+		wakeup_socket.setblocking(False)
+	_chat_thread = threading.Thread(
+		target=_chat_worker,
+		args=(_chat_wakeup[0],),
+		name="TwitchChatThread",
+		daemon=True,
+	)
 	_chat_thread.start()
+	start_prefetch_thread()
 
 
 def stop_chat_thread():
-	# Signal the chat worker to stop and wait for it to exit cleanly
-	global _chat_thread, _chat_socket
+	# Signal the chat event loop to stop; it wakes up immediately and exits
+	global _chat_thread, _chat_wakeup
 
+	_speech_process.stop(SPEECH_PROCESS_JOIN_SECONDS)
 	_stop_event.set()
-	if _chat_socket is not None:
-		try:
-			_chat_socket.shutdown(socket.SHUT_RDWR)
-		except Exception:
-			pass
-		try:
-			_chat_socket.close()
-		except Exception:
-			pass
-		_chat_socket = None
+	_wake_chat_loop()
 
 	if _chat_thread is not None:
 		_chat_thread.join(timeout=2.0)
 		_chat_thread = None
 
+	if _chat_wakeup is not None:
+		for wakeup_socket in _chat_wakeup:
+			wakeup_socket.close()
+		_chat_wakeup = None
 
+	stop_prefetch_thread()
 
-def stop_tts_thread():
-	# Join the speech synthesis worker if it is still running
-	global _tts_thread
 
-	if _tts_thread is not None and _tts_thread.is_alive():
-		_tts_thread.join(timeout=1.0)
-	_tts_thread = None
+def start_prefetch_thread():
+	# Launch the worker that renders upcoming queued messages ahead of time
+	global _prefetch_thread, _prefetch_stopping
 
+	if _prefetch_thread is not None and _prefetch_thread.is_alive():
+		return
 
-def _drain_queue():
-	# Remove any queued messages so new configuration starts fresh
-	while True:
-		try:
-			_message_queue.get_nowait()
-		except queue.Empty:
-			break
+	with _prefetch_condition:
+		_prefetch_stopping = False
+	_prefetch_thread = threading.Thread(target=_prefetch_worker, name="TwitchTTSPrefetchThread", daemon=True)
+	_prefetch_thread.start()
 
 
-def _chat_worker():
-	# Background loop that connects to Twitch IRC and parses chat messages
-	global _chat_socket
+def stop_prefetch_thread():
+	global _prefetch_thread, _prefetch_stopping
 
-	backoff = 5
-	while not _stop_event.is_set() and enabled:
+	with _prefetch_condition:
+		_prefetch_stopping = True
+		_prefetch_condition.notify_all()
+
+	if _prefetch_thread is not None:
+		_prefetch_thread.join(timeout=2.0)
+		_prefetch_thread = None
+
+	with _prerendered_lock:
+		_prerendered.clear()
+
+
+
+def stop_tts_thread():
+	# Cancel anything being spoken and let the playback worker exit
+	_tts_worker.stop(timeout=SHUTDOWN_JOIN_SECONDS)
+
+
+def _is_chat_running() -> bool:
+	if use_child_process:
+		return _speech_process.running
+	return _chat_thread is not None and _chat_thread.is_alive()
+
+
+class _SpeechProcessHost:
+	"""Runs chat ingestion and speech in a separate Python process.
+
+	IRC parsing, filtering, scheduling and synthesis then no longer compete
+	with OBS and other scripts for the embedded interpreter's GIL. The child
+	sends back only small display, visibility and log commands, which pump()
+	applies from the OBS timer.
+	"""
+
+	def __init__(self):
+		self._process = None
+		self._connection = None
+
+	@property
+	def running(self) -> bool:
+		return self._process is not None and self._process.is_alive()
+
+	def start(self, settings: dict) -> bool:
+		executable = _python_executable()
+		if executable is None:
+			obs.script_log(obs.LOG_ERROR, "python3 not found; cannot start the speech process")
+			return False
+
+		context = multiprocessing.get_context("spawn")
+		# Inside OBS sys.executable is OBS itself, so point spawn at a real interpreter
+		context.set_executable(executable)
+		host_connection, child_connection = context.Pipe()
+		process = context.Process(
+			target=runpy.run_path,
+			kwargs={
+				"path_name": os.path.abspath(__file__),
+				"init_globals": {"_SPEECH_PROCESS_ARGS": (settings, child_connection)},
+				"run_name": SPEECH_PROCESS_RUN_NAME,
+			},
+			name="TwitchTTSProcess",
+			daemon=True,
+		)
 		try:
-			_chat_socket = socket.create_connection((TWITCH_SERVER, TWITCH_PORT))
-			_chat_socket.settimeout(1.0)
-			_perform_handshake(_chat_socket)
-			if _stop_event.is_set():
-				break
-			obs.script_log(obs.LOG_INFO, "Connected to Twitch chat")
-			_listen_loop(_chat_socket)
-			backoff = 5
+			process.start()
 		except Exception as err:
-			if _stop_event.is_set():
-				break
-			obs.script_log(obs.LOG_WARNING, f"Chat connection error: {err}")
-			time.sleep(backoff)
-			backoff = min(backoff * 2, 60)
+			obs.script_log(obs.LOG_ERROR, f"Failed to start the speech process: {err}")
+			host_connection.close()
+			return False
 		finally:
-			if _chat_socket is not None:
-				try:
-					_chat_socket.close()
-				except Exception:
-					pass
-				_chat_socket = None
+			child_connection.close()
 
+		self._process = process
+		self._connection = host_connection
+		return True
 
+	def send(self, *command):
+		if self._connection is None:
+			return
+		try:
+			self._connection.send(command)
+		except (OSError, ValueError):
+			pass
 
+	def pump(self):
+		# Apply whatever the child asked for since the last tick
+		connection = self._connection
+		if connection is None:
+			return
+		try:
+			while connection.poll():
+				self._apply(connection.recv())
+		except (EOFError, OSError):
+			if self._process is not None and self._process.exitcode not in (None, 0):
+				obs.script_log(obs.LOG_ERROR, f"Speech process exited with code {self._process.exitcode}")
+			self._close()
+
+	def stop(self, timeout: float):
+		process = self._process
+		if process is None:
+			return
 
-def _perform_handshake(sock: socket.socket):
-	if _stop_event.is_set() or not enabled:
-		return
+		self.send("stop")
+		process.join(timeout)
+		if process.is_alive():
+			process.terminate()
+			process.join(SHUTDOWN_JOIN_SECONDS)
+		if process.is_alive():
+			process.kill()
+			process.join(SHUTDOWN_JOIN_SECONDS)
+		self.pump()
+		self._close()
 
-	token = oauth_token if oauth_token else "SCHMOOPIIE"
-	if token and not token.startswith("oauth:"):
-		token = f"oauth:{token}"
+	def _close(self):
+		if self._connection is not None:
+			self._connection.close()
+		self._connection = None
+		self._process = None
 
-	login_lines = [
-		"CAP REQ :twitch.tv/membership\r\n",
-		f"PASS {token}\r\n",
-		f"NICK {nickname}\r\n",
-		f"JOIN {channel}\r\n",
-	]
+	@staticmethod
+	def _apply(command: tuple):
+		kind = command[0]
+		if kind == "text":
+			_set_text_source_text(command[1])
+		elif kind == "visible":
+			_set_display_visibility(command[1])
+		elif kind == "log":
+			obs.script_log(command[1], command[2])
 
-	for line in login_lines:
-		if _stop_event.is_set():
-			return
-		sock.sendall(line.encode("utf-8"))
 
+_speech_process = _SpeechProcessHost()
 
 
-def _listen_loop(sock: socket.socket):
-	partial = ""
-	while not _stop_event.is_set() and enabled:
-		try:
-			data = sock.recv(2048)
-			if not data:
-				raise ConnectionError("socket closed")
-		except socket.timeout:
-			continue
-		except (OSError, ConnectionError) as err:
-			if _stop_event.is_set():
-				return
-			raise ConnectionError(err) from err
+def _python_executable() -> Optional[str]:
+	if os.path.basename(sys.executable).lower().startswith("python"):
+		return sys.executable
+	return shutil.which("python3") or shutil.which("python")
 
-		partial += data.decode("utf-8", errors="ignore")
-		while "\r\n" in partial:
-			line, partial = partial.split("\r\n", 1)
-			_handle_line(sock, line)
 
+def _speech_process_settings() -> dict:
+	settings = {name: globals()[name] for name in _SPEECH_PROCESS_SETTINGS}
+	settings["priority_weights"] = _message_queue.weights()
+	return settings
 
-def _handle_line(sock: socket.socket, line: str):
-	if not line:
-		return
-	if line.startswith("PING"):
-		try:
-			sock.sendall("PONG :tmi.twitch.tv\r\n".encode("utf-8"))
-		except Exception as err:
-			obs.script_log(obs.LOG_WARNING, f"Failed to respond to PING: {err}")
-		return
 
-	if " JOIN " in line:
-		_handle_join(line)
-		return
+class _SpeechProcessLog:
+	"""Stands in for obspython inside the speech process, forwarding log lines to OBS."""
 
-	if "PRIVMSG" not in line:
-		return
+	LOG_ERROR = 100
+	LOG_WARNING = 200
+	LOG_INFO = 300
+	LOG_DEBUG = 400
 
-	prefix, _, trailing = line.partition(" PRIVMSG ")
-	if not trailing:
-		return
+	def script_log(self, level: int, message: str):
+		_send_to_host("log", level, message)
 
-	username = prefix.split("!")[0]
-	if username.startswith(":"):
-		username = username[1:]
 
-	message = trailing.split(":", 1)[-1]
-	if not message:
-		return
+_host_connection = None
+_host_connection_lock = threading.Lock()
 
-	text = message.strip()
-	if not text:
-		return
 
-	if trigger_word:
-		lowered = text.lower()
-		trigger_lower = trigger_word.lower()
-		if not lowered.startswith(trigger_lower):
-			return
-		suffix = text[len(trigger_word):]
-		if not suffix or not suffix[0].isspace():
-			return
-		text = suffix.lstrip()
-		if not text:
+def _send_to_host(*command):
+	# Chat, playback and prefetch threads all report through the one pipe
+	with _host_connection_lock:
+		try:
+			_host_connection.send(command)
+		except (OSError, ValueError):
+			pass
+
+
+def _run_speech_process(settings: dict, connection):
+	# Entry point of the child process started by _SpeechProcessHost
+	global obs, enabled, _host_connection
+
+	obs = _SpeechProcessLog()
+	_host_connection = connection
+	signal.signal(signal.SIGTERM, _exit_speech_process)
+	_apply_speech_process_settings(settings)
+	enabled = True
+	start_chat_thread()
+
+	try:
+		next_deadline = 0.0
+		while True:
+			timeout = min(max(0.0, next_deadline - time.time()), EVENT_POLL_SECONDS)
+			if connection.poll(timeout) and not _handle_host_command(connection.recv()):
+				break
+			next_deadline = time.time() + _run_main_work()
+	except (EOFError, OSError):
+		# OBS closed its end of the pipe
+		pass
+	finally:
+		_process_supervisor.terminate(_process_supervisor.ALL)
+		stop_chat_thread()
+		stop_tts_thread()
+		_shutdown_tts_engine()
+		_metrics_exporter.stop()
+
+
+def _exit_speech_process(signal_number, frame):
+	raise SystemExit(0)
+
+
+def _apply_speech_process_settings(settings: dict):
+	settings = dict(settings)
+	_message_queue.set_weights(settings.pop("priority_weights"))
+	with _settings_lock:
+		globals().update(settings)
+	_configure_audio_cache()
+	_configure_sanitizer()
+	_configure_text_filter()
+	_configure_channels()
+	_configure_metrics()
+
+
+def _handle_host_command(command: tuple) -> bool:
+	# Returns False once OBS asks the speech process to exit
+	kind = command[0]
+	if kind == "stop":
+		return False
+	if kind == "settings":
+		_apply_speech_process_settings(command[1])
+	elif kind == "skip":
+		skip_current_message()
+	elif kind == "flush":
+		flush_speech_queue()
+	elif kind == "log_cache_stats":
+		_on_log_cache_stats_clicked(None, None)
+	elif kind == "log_adaptive_status":
+		_on_log_adaptive_status_clicked(None, None)
+	elif kind == "log_connection_status":
+		_on_log_connection_status_clicked(None, None)
+	return True
+
+
+def _drain_queue():
+	# Remove any queued messages so new configuration starts fresh
+	global _skipped_since_spoken
+
+	_message_queue.clear()
+	_skipped_since_spoken = 0
+	with _prerendered_lock:
+		_prerendered.clear()
+	_clear_pending_greets()
+
+
+def _wake_chat_loop():
+	wakeup = _chat_wakeup
+	if wakeup is None:
+		return
+	try:
+		wakeup[1].send(b"\0")
+	except (BlockingIOError, OSError):
+		# A full buffer already guarantees a pending wakeup
+		pass
+
+
+def _chat_worker(wakeup_reader: socket.socket):
+	# Event loop that connects to Twitch IRC and services its socket
+	global _chat_connection
+
+	selector = selectors.DefaultSelector()
+	selector.register(wakeup_reader, selectors.EVENT_READ, None)
+	jitter = random.Random()
+	attempt = 0
+	# Set once a connection has carried traffic; the next successful connect is a reconnect
+	link_was_up = False
+	try:
+		while not _stop_event.is_set() and enabled:
+			connection = None
+			try:
+				connection = _connect_chat(selector)
+				if connection is None:
+					break
+				_chat_connection = connection
+				if link_was_up:
+					_chat_link_stats.record_reconnect()
+					link_was_up = False
+				_perform_handshake(connection)
+				obs.script_log(obs.LOG_INFO, "Connected to Twitch chat")
+				_run_chat_loop(selector, connection)
+				continue
+			except Exception as err:
+				if _stop_event.is_set():
+					break
+				obs.script_log(obs.LOG_WARNING, f"Chat connection error: {err}")
+			finally:
+				if connection is not None:
+					connection.close()
+					_clear_pending_greets()
+					# A connection that got as far as receiving lines starts the backoff over
+					if connection.lines_received:
+						attempt = 0
+						link_was_up = True
+				_chat_connection = None
+
+			if _wait_for_wakeup(selector, _reconnect_delay(attempt, jitter)):
+				break
+			attempt += 1
+	finally:
+		selector.close()
+
+
+def _reconnect_delay(attempt: int, jitter: random.Random) -> float:
+	# Quick first retry, then exponential backoff with jitter so restarted
+	# clients do not all reconnect in the same instant
+	if attempt == 0:
+		return RECONNECT_FIRST_DELAY * (1.0 + jitter.random())
+	ceiling = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** (attempt - 1))
+	return ceiling / 2.0 + jitter.uniform(0.0, ceiling / 2.0)
+
+
+class _ChatLinkStats:
+	"""Round-trip time and reconnect counters for the chat connection."""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self.rtt_last = 0.0
+		self.rtt_average = 0.0
+		self.pongs = 0
+		self.missed_pongs = 0
+		self.reconnects = 0
+
+	def record_rtt(self, rtt: float):
+		with self._lock:
+			self.rtt_last = rtt
+			self.rtt_average = rtt if not self.pongs else self.rtt_average + 0.2 * (rtt - self.rtt_average)
+			self.pongs += 1
+
+	def record_missed_pong(self):
+		with self._lock:
+			self.missed_pongs += 1
+
+	def record_reconnect(self):
+		with self._lock:
+			self.reconnects += 1
+
+	def snapshot(self) -> dict:
+		with self._lock:
+			return {
+				"rtt_last": self.rtt_last,
+				"rtt_average": self.rtt_average,
+				"pongs": self.pongs,
+				"missed_pongs": self.missed_pongs,
+				"reconnects": self.reconnects,
+			}
+
+
+_chat_link_stats = _ChatLinkStats()
+
+
+def _on_log_connection_status_clicked(props, prop):
+	if _speech_process.running:
+		_speech_process.send("log_connection_status")
+		return False
+
+	stats = _chat_link_stats.snapshot()
+	state = "connected" if _chat_connection is not None else "not connected"
+	obs.script_log(
+		obs.LOG_INFO,
+		f"Chat {state}: PING round trip {stats['rtt_last'] * 1000.0:.1f} ms "
+		f"(average {stats['rtt_average'] * 1000.0:.1f} ms, {stats['pongs']} answered, "
+		f"{stats['missed_pongs']} missed), {stats['reconnects']} reconnects",
+	)
+	return False
+
+
+class _RollingCounter:
+	"""A running total plus per-second counts for the last few minutes.
+
+	The per-second slots are preallocated and reused as the clock moves on,
+	so counting never allocates.
+	"""
+
+	def __init__(self, seconds: int):
+		self.total = 0
+		self._counts = array("q", [0]) * seconds
+		self._seconds = array("q", [-1]) * seconds
+
+	def add(self, amount: int, now: float):
+		second = int(now)
+		slot = second % len(self._counts)
+		if self._seconds[slot] != second:
+			self._seconds[slot] = second
+			self._counts[slot] = 0
+		self._counts[slot] += amount
+		self.total += amount
+
+	def recent(self, now: float) -> int:
+		oldest = int(now) - len(self._counts)
+		return sum(count for count, second in zip(self._counts, self._seconds) if second > oldest)
+
+
+class _LatencySeries:
+	"""Latency samples: the most recent ones in a preallocated ring for
+	percentiles, and a cumulative histogram for the whole session."""
+
+	def __init__(self, size: int):
+		self._ring = array("d", [0.0]) * size
+		self._next = 0
+		self._filled = 0
+		self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+		self.count = 0
+		self.sum = 0.0
+
+	def add(self, seconds: float):
+		seconds = max(0.0, seconds)
+		self._ring[self._next] = seconds
+		self._next = (self._next + 1) % len(self._ring)
+		self._filled = min(self._filled + 1, len(self._ring))
+		index = 0
+		while index < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[index]:
+			index += 1
+		self.buckets[index] += 1
+		self.count += 1
+		self.sum += seconds
+
+	def percentile(self, fraction: float) -> float:
+		if not self._filled:
+			return 0.0
+		ordered = sorted(self._ring[: self._filled])
+		return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class _PipelineMetrics:
+	"""Counters and latency distributions for the chat-to-speech pipeline.
+
+	Messages carry monotonic timestamps for receive, enqueue and dispatch;
+	the playback worker adds synthesis start and playback end and records
+	the whole set here once the message has been spoken.
+	"""
+
+	# rejected: turned away on arrival; dropped/expired: removed after queueing
+	COUNTERS = ("received", "queued", "rejected", "dropped", "expired", "spoken")
+	LATENCIES = {
+		"queue_wait": "Seconds from enqueue to dispatch",
+		"chat_to_speech": "Seconds from receiving a chat line to starting its speech",
+		"end_to_end": "Seconds from receiving a chat line to the end of its playback",
+		"speech": "Seconds from synthesis start to playback end",
+	}
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._counters = {name: _RollingCounter(METRICS_WINDOW_SECONDS) for name in self.COUNTERS}
+		self._latencies = {name: _LatencySeries(METRICS_RING_SIZE) for name in self.LATENCIES}
+
+	def count(self, name: str, amount: int = 1):
+		with self._lock:
+			self._counters[name].add(amount, time.monotonic())
+
+	def record_spoken(self, message: QueuedMessage, started: float, finished: float):
+		parts = message.parts or (message,)
+		with self._lock:
+			self._counters["spoken"].add(len(parts), finished)
+			self._latencies["speech"].add(finished - started)
+			for part in parts:
+				received = part.received_at or part.enqueued_at
+				if part.enqueued_at and message.dispatched_at:
+					self._latencies["queue_wait"].add(message.dispatched_at - part.enqueued_at)
+				if received:
+					self._latencies["chat_to_speech"].add(started - received)
+					self._latencies["end_to_end"].add(finished - received)
+
+	def snapshot(self) -> dict:
+		now = time.monotonic()
+		with self._lock:
+			counters = {
+				name: {"total": counter.total, f"last_{METRICS_WINDOW_SECONDS}s": counter.recent(now)}
+				for name, counter in self._counters.items()
+			}
+			latencies = {
+				name: {
+					"count": series.count,
+					"p50": series.percentile(0.5),
+					"p99": series.percentile(0.99),
+				}
+				for name, series in self._latencies.items()
+			}
+		offered = counters["queued"]["total"] + counters["rejected"]["total"]
+		lost = sum(counters[name]["total"] for name in ("rejected", "dropped", "expired"))
+		return {
+			"timestamp": time.time(),
+			"queue_depth": _message_queue.qsize(),
+			"counters": counters,
+			"drop_rate": 0.0 if not offered else lost / offered,
+			"latency_seconds": latencies,
+			"chat_link": _chat_link_stats.snapshot(),
+			"adaptive": _adaptive_status(),
+		}
+
+	def prometheus(self) -> str:
+		lines = [
+			"# TYPE text2espeak_queue_depth gauge",
+			f"text2espeak_queue_depth {_message_queue.qsize()}",
+		]
+		with self._lock:
+			for name, counter in self._counters.items():
+				lines.append(f"# TYPE text2espeak_messages_{name}_total counter")
+				lines.append(f"text2espeak_messages_{name}_total {counter.total}")
+			for name, series in self._latencies.items():
+				metric = f"text2espeak_{name}_seconds"
+				lines.append(f"# HELP {metric} {self.LATENCIES[name]}")
+				lines.append(f"# TYPE {metric} histogram")
+				cumulative = 0
+				for bound, bucket_count in zip(LATENCY_BUCKETS + (math.inf,), series.buckets):
+					cumulative += bucket_count
+					label = "+Inf" if bound == math.inf else f"{bound:g}"
+					lines.append(f'{metric}_bucket{{le="{label}"}} {cumulative}')
+				lines.append(f"{metric}_sum {series.sum:.6f}")
+				lines.append(f"{metric}_count {series.count}")
+
+		link = _chat_link_stats.snapshot()
+		lines.extend((
+			"# TYPE text2espeak_chat_rtt_seconds gauge",
+			f"text2espeak_chat_rtt_seconds {link['rtt_last']:.6f}",
+			"# TYPE text2espeak_chat_missed_pongs_total counter",
+			f"text2espeak_chat_missed_pongs_total {link['missed_pongs']}",
+			"# TYPE text2espeak_chat_reconnects_total counter",
+			f"text2espeak_chat_reconnects_total {link['reconnects']}",
+		))
+		adaptive = _adaptive_status()
+		lines.extend((
+			"# TYPE text2espeak_effective_speech_rate gauge",
+			f"text2espeak_effective_speech_rate {adaptive['effective_speech_rate']}",
+			"# TYPE text2espeak_effective_speak_interval_seconds gauge",
+			f"text2espeak_effective_speak_interval_seconds {adaptive['effective_speak_interval_seconds']:.6f}",
+			"# TYPE text2espeak_estimated_drain_seconds gauge",
+			f"text2espeak_estimated_drain_seconds {adaptive['estimated_drain_seconds']:.6f}",
+		))
+		return "\n".join(lines) + "\n"
+
+
+_pipeline_metrics = _PipelineMetrics()
+
+
+class _MetricsRequestHandler(http.server.BaseHTTPRequestHandler):
+	def do_GET(self):
+		if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+			self.send_error(404)
+			return
+		body = _pipeline_metrics.prometheus().encode("utf-8")
+		self.send_response(200)
+		self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, format, *args):
+		# Keep scrapes out of the OBS log
+		pass
+
+
+class _MetricsExporter:
+	"""Serves Prometheus text on localhost and/or rewrites a JSON snapshot file."""
+
+	def __init__(self):
+		self._port = 0
+		self._failed_port = 0
+		self._path = ""
+		self._server: Optional[http.server.ThreadingHTTPServer] = None
+		self._server_thread: Optional[threading.Thread] = None
+		self._writer_thread: Optional[threading.Thread] = None
+		self._stop = threading.Event()
+
+	def configure(self, port: int, path: str):
+		# Settings callbacks arrive on every keystroke; only touch what changed
+		if port == self._port:
+			self._failed_port = 0
+		elif port != self._failed_port:
+			self._configure_server(port)
+		if path != self._path:
+			self._stop_writer()
+			self._start_writer(path)
+
+	def _configure_server(self, port: int):
+		server = None
+		if port:
+			try:
+				server = http.server.ThreadingHTTPServer((METRICS_HOST, port), _MetricsRequestHandler)
+			except OSError as err:
+				# Keep serving on the old port; the same port is not retried until it changes
+				kept = f", still serving on port {self._port}" if self._server is not None else ""
+				obs.script_log(obs.LOG_WARNING, f"Metrics endpoint unavailable on port {port}: {err}{kept}")
+				self._failed_port = port
+				return
+		self._stop_server()
+		self._port = port
+		self._failed_port = 0
+		if server is None:
+			return
+		server.daemon_threads = True
+		self._server = server
+		self._server_thread = threading.Thread(
+			target=server.serve_forever,
+			kwargs={"poll_interval": EVENT_POLL_SECONDS},
+			name="TwitchTTSMetricsServer",
+			daemon=True,
+		)
+		self._server_thread.start()
+
+	def _start_writer(self, path: str):
+		self._path = path
+		if not path:
+			return
+		self._stop.clear()
+		self._writer_thread = threading.Thread(
+			target=self._write_periodically,
+			args=(path,),
+			name="TwitchTTSMetricsWriter",
+			daemon=True,
+		)
+		self._writer_thread.start()
+
+	def stop(self):
+		self._stop_server()
+		self._stop_writer()
+		self._port = 0
+		self._failed_port = 0
+
+	def _stop_server(self):
+		if self._server is not None:
+			self._server.shutdown()
+			self._server.server_close()
+			self._server = None
+		if self._server_thread is not None:
+			self._server_thread.join(timeout=SHUTDOWN_JOIN_SECONDS)
+			self._server_thread = None
+
+	def _stop_writer(self):
+		self._stop.set()
+		if self._writer_thread is not None:
+			self._writer_thread.join(timeout=SHUTDOWN_JOIN_SECONDS)
+			self._writer_thread = None
+		self._path = ""
+
+	def _write_periodically(self, path: str):
+		while not self._stop.wait(METRICS_WRITE_SECONDS):
+			self._write(path)
+		self._write(path)
+
+	@staticmethod
+	def _write(path: str):
+		temporary = f"{path}.tmp"
+		try:
+			with open(temporary, "w", encoding="utf-8") as handle:
+				json.dump(_pipeline_metrics.snapshot(), handle, indent=2)
+			os.replace(temporary, path)
+		except OSError as err:
+			_metrics_log.warning(f"Failed to write metrics file: {err}")
+
+
+_metrics_exporter = _MetricsExporter()
+_metrics_log = _RateLimitedLog(60.0)
+
+
+def _configure_metrics():
+	# Export from wherever the pipeline runs: here, or inside the speech process
+	if use_child_process:
+		_metrics_exporter.configure(0, "")
+	else:
+		_metrics_exporter.configure(metrics_port, metrics_file)
+
+
+def _drain_wakeup(wakeup_reader: socket.socket):
+	try:
+		while wakeup_reader.recv(512):
+			pass
+	except (BlockingIOError, OSError):
+		pass
+
+
+def _wait_for_wakeup(selector: selectors.BaseSelector, timeout: float) -> bool:
+	# Sleep until the timeout passes or a stop is requested; True when stopping
+	deadline = time.monotonic() + timeout
+	while not _stop_event.is_set():
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			return False
+		for key, _ in selector.select(remaining):
+			if key.data is None:
+				_drain_wakeup(key.fileobj)
+	return True
+
+
+def _resolve_chat_server(selector: selectors.BaseSelector) -> Optional[tuple]:
+	# getaddrinfo blocks and the wakeup socket cannot interrupt it, so it runs
+	# on a helper thread while this one waits in the selector; None when stopping
+	result = []
+
+	def resolve():
+		try:
+			result.append(socket.getaddrinfo(TWITCH_SERVER, TWITCH_PORT, type=socket.SOCK_STREAM)[0])
+		except Exception as err:
+			result.append(err)
+		_wake_chat_loop()
+
+	threading.Thread(target=resolve, name="TwitchChatResolver", daemon=True).start()
+	deadline = time.monotonic() + CONNECT_TIMEOUT
+	while not result:
+		if _stop_event.is_set():
+			return None
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			raise TimeoutError("timed out resolving the Twitch chat server")
+		for key, _ in selector.select(remaining):
+			if key.data is None:
+				_drain_wakeup(key.fileobj)
+	if isinstance(result[0], Exception):
+		raise result[0]
+	return result[0]
+
+
+def _connect_chat(selector: selectors.BaseSelector) -> Optional["_IrcConnection"]:
+	resolved = _resolve_chat_server(selector)
+	if resolved is None:
+		return None
+	family, socktype, proto, _, address = resolved
+	sock = socket.socket(family, socktype, proto)
+	sock.setblocking(False)
+	try:
+		result = sock.connect_ex(address)
+		if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+			raise OSError(result, os.strerror(result))
+
+		selector.register(sock, selectors.EVENT_WRITE, sock)
+		try:
+			deadline = time.monotonic() + CONNECT_TIMEOUT
+			connected = False
+			while not connected:
+				remaining = deadline - time.monotonic()
+				if remaining <= 0:
+					raise TimeoutError("timed out connecting to Twitch chat")
+				for key, _ in selector.select(remaining):
+					if key.data is None:
+						_drain_wakeup(key.fileobj)
+					else:
+						connected = True
+				if _stop_event.is_set():
+					sock.close()
+					return None
+		finally:
+			selector.unregister(sock)
+
+		error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+		if error:
+			raise OSError(error, os.strerror(error))
+	except Exception:
+		sock.close()
+		raise
+
+	return _IrcConnection(sock, selector)
+
+
+def _run_chat_loop(selector: selectors.BaseSelector, connection: "_IrcConnection"):
+	# Block in select until the socket or the wakeup pipe has work, or the next PING is due
+	while not _stop_event.is_set() and enabled:
+		now = time.monotonic()
+		timeout = min(connection.keepalive_timeout(now), _flush_due_greetings(now))
+		for key, mask in selector.select(timeout):
+			if key.data is None:
+				_drain_wakeup(key.fileobj)
+				continue
+			key.data.handle_event(mask)
+		connection.check_keepalive(time.monotonic())
+
+
+class _IrcConnection:
+	"""Non-blocking IRC socket serviced by the chat event loop."""
+
+	def __init__(self, sock: socket.socket, selector: selectors.BaseSelector):
+		self.sock = sock
+		self._selector = selector
+		self._framer = _IrcLineFramer()
+		self._outgoing = bytearray()
+		self._events = selectors.EVENT_READ
+		selector.register(sock, self._events, self)
+		self.lines_received = 0
+		self.received_at = 0.0
+		self._next_ping = time.monotonic() + keepalive_interval
+		self._ping_token = ""
+		self._ping_sent_at = 0.0
+		self._missed_pongs = 0
+		self._ping_sequence = itertools.count(1)
+
+	def keepalive_timeout(self, now: float) -> float:
+		return max(0.0, self._next_ping - now)
+
+	def check_keepalive(self, now: float):
+		# Send our own PING on a schedule; a half-open socket never answers
+		if now < self._next_ping:
+			return
+		if self._ping_token:
+			self._missed_pongs += 1
+			_chat_link_stats.record_missed_pong()
+			if self._missed_pongs >= keepalive_missed_pongs:
+				raise ConnectionError(f"no PONG from Twitch chat after {self._missed_pongs} checks")
+		self._ping_token = f"t2e-{next(self._ping_sequence)}"
+		self._ping_sent_at = now
+		self._next_ping = now + keepalive_interval
+		self.send_line(f"PING :{self._ping_token}")
+
+	def handle_pong(self, token: str):
+		if not self._ping_token or token != self._ping_token:
+			return
+		_chat_link_stats.record_rtt(time.monotonic() - self._ping_sent_at)
+		self._ping_token = ""
+		self._missed_pongs = 0
+
+	def send_line(self, line: str):
+		self._outgoing += f"{line}\r\n".encode("utf-8")
+		self._flush()
+
+	def handle_event(self, mask: int):
+		if mask & selectors.EVENT_WRITE:
+			self._flush()
+		if mask & selectors.EVENT_READ:
+			self._read()
+
+	def _flush(self):
+		if self._outgoing:
+			try:
+				sent = self.sock.send(self._outgoing)
+				del self._outgoing[:sent]
+			except BlockingIOError:
+				pass
+
+		events = selectors.EVENT_READ
+		if self._outgoing:
+			events |= selectors.EVENT_WRITE
+		if events != self._events:
+			self._selector.modify(self.sock, events, self)
+			self._events = events
+
+	def _read(self):
+		try:
+			received = self._framer.recv_from(self.sock)
+		except BlockingIOError:
 			return
+		if not received:
+			raise ConnectionError("socket closed")
+
+		self.received_at = time.monotonic()
+		lines = self._framer.pop_lines()
+		with _settings_lock:
+			for line in lines:
+				self.lines_received += 1
+				_handle_line(self, line)
+
+	def close(self):
+		try:
+			self._selector.unregister(self.sock)
+		except (KeyError, ValueError):
+			pass
+		try:
+			self.sock.close()
+		except OSError:
+			pass
+
+
+class _IrcLineFramer:
+	"""Splits a byte stream into CRLF-terminated lines without re-copying it.
+
+	Data is received straight into a reusable buffer. Each complete line is
+	decoded exactly once, the search for CRLF resumes where the previous one
+	stopped, and the unfinished tail is moved to the front only when the
+	buffer runs out of room.
+	"""
+
+	def __init__(self, size: int = RECV_BUFFER_SIZE):
+		self._buffer = bytearray(size)
+		self._view = memoryview(self._buffer)
+		self._start = 0
+		self._scan = 0
+		self._end = 0
+
+	def _reserve(self):
+		if self._end < len(self._buffer):
+			return
+		pending = self._end - self._start
+		if self._start > 0:
+			self._buffer[:pending] = self._view[self._start : self._end]
+			self._scan -= self._start
+			self._start = 0
+			self._end = pending
+			return
+
+		# A single line fills the whole buffer; double it
+		self._view.release()
+		self._buffer.extend(bytes(len(self._buffer)))
+		self._view = memoryview(self._buffer)
+
+	def recv_from(self, sock: socket.socket) -> int:
+		self._reserve()
+		received = sock.recv_into(self._view[self._end :])
+		self._end += received
+		return received
+
+	def feed(self, data: bytes):
+		view = memoryview(data)
+		while view:
+			self._reserve()
+			count = min(len(view), len(self._buffer) - self._end)
+			self._buffer[self._end : self._end + count] = view[:count]
+			self._end += count
+			view = view[count:]
+
+	def pop_lines(self) -> list[str]:
+		lines = []
+		buffer = self._buffer
+		view = self._view
+		start = self._start
+		end = self._end
+		index = buffer.find(b"\r\n", self._scan, end)
+		while index >= 0:
+			lines.append(str(view[start:index], "utf-8", "ignore"))
+			start = index + 2
+			index = buffer.find(b"\r\n", start, end)
+
+		if start == end:
+			self._start = self._scan = self._end = 0
+		else:
+			self._start = start
+			# Back up one byte in case the next read completes a split CRLF
+			self._scan = max(start, end - 1)
+		return lines
+
+
+def _perform_handshake(connection: _IrcConnection):
+	if _stop_event.is_set() or not enabled:
+		return
+
+	token = oauth_token if oauth_token else "SCHMOOPIIE"
+	if token and not token.startswith("oauth:"):
+		token = f"oauth:{token}"
+
+	login_lines = [
+		"CAP REQ :twitch.tv/membership twitch.tv/tags",
+		f"PASS {token}",
+		f"NICK {nickname}",
+		f"JOIN {','.join(_channels)}",
+	]
+
+	for line in login_lines:
+		connection.send_line(line)
+
+
+class _IrcMessage:
+	"""A parsed IRC line.
+
+	``tags`` is only filled for commands listed in _TAGGED_COMMANDS; for
+	commands the script ignores, parsing stops right after the command.
+	"""
+
+	__slots__ = ("tags", "prefix", "nick", "command", "params", "trailing")
+
+	def __init__(self, tags: dict, prefix: str, command: str, params: tuple, trailing: Optional[str]):
+		self.tags = tags
+		self.prefix = prefix
+		self.nick = prefix.split("!", 1)[0]
+		self.command = command
+		self.params = params
+		self.trailing = trailing
+
+
+_HANDLED_COMMANDS = frozenset(("PING", "PONG", "JOIN", "PRIVMSG"))
+_TAGGED_COMMANDS = frozenset(("PRIVMSG",))
+_TAG_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+
+def _parse_irc_line(line: str) -> Optional[_IrcMessage]:
+	# Single left-to-right pass: [@tags] [:prefix] COMMAND [params] [:trailing]
+	position = 0
+	tags_end = 0
+	if line.startswith("@"):
+		tags_end = line.find(" ")
+		if tags_end < 0:
+			return None
+		position = tags_end + 1
+		while line.startswith(" ", position):
+			position += 1
+
+	prefix = ""
+	if line.startswith(":", position):
+		space = line.find(" ", position)
+		if space < 0:
+			return None
+		prefix = line[position + 1 : space]
+		position = space + 1
+		while line.startswith(" ", position):
+			position += 1
+
+	space = line.find(" ", position)
+	command = line[position:] if space < 0 else line[position:space]
+	if not command:
+		return None
+	if command not in _HANDLED_COMMANDS:
+		return _IrcMessage({}, prefix, command, (), None)
+
+	trailing = None
+	middle = ""
+	if space >= 0:
+		rest = line[space + 1 :]
+		if rest.startswith(":"):
+			trailing = rest[1:]
+		else:
+			split = rest.find(" :")
+			if split < 0:
+				middle = rest
+			else:
+				middle = rest[:split]
+				trailing = rest[split + 2 :]
+
+	tags = {}
+	if tags_end and command in _TAGGED_COMMANDS:
+		tags = _parse_irc_tags(line[1:tags_end])
+	return _IrcMessage(tags, prefix, command, tuple(middle.split()), trailing)
+
+
+def _parse_irc_tags(raw_tags: str) -> dict[str, str]:
+	tags = {}
+	for item in raw_tags.split(";"):
+		key, _, value = item.partition("=")
+		if "\\" in value:
+			value = _unescape_tag_value(value)
+		tags[key] = value
+	return tags
+
+
+def _unescape_tag_value(value: str) -> str:
+	chars = []
+	index = 0
+	length = len(value)
+	while index < length:
+		ch = value[index]
+		if ch == "\\" and index + 1 < length:
+			index += 1
+			ch = _TAG_ESCAPES.get(value[index], value[index])
+		elif ch == "\\":
+			ch = ""
+		chars.append(ch)
+		index += 1
+	return "".join(chars)
+
+
+def _handle_line(connection: _IrcConnection, line: str):
+	if not line:
+		return
+	message = _parse_irc_line(line)
+	if message is None:
+		return
+
+	command = message.command
+	if command == "PING":
+		try:
+			connection.send_line(f"PONG :{message.trailing or 'tmi.twitch.tv'}")
+		except Exception as err:
+			obs.script_log(obs.LOG_WARNING, f"Failed to respond to PING: {err}")
+		return
+
+	if command == "PONG":
+		connection.handle_pong(message.trailing or "")
+		return
+
+	channel_state = _channels.get(message.params[0].lower()) if message.params else None
+	if channel_state is None:
+		return
+
+	if command == "JOIN":
+		_handle_join(message, channel_state, connection.received_at)
+		return
+
+	if command != "PRIVMSG" or not message.trailing:
+		return
+	_pipeline_metrics.count("received")
+
+	username = message.nick
+	display_name = message.tags.get("display-name") or username
+
+	text = message.trailing.strip()
+	if not text:
+		return
+
+	profile = None
+	matched = channel_state.trigger_trie.match(text) if channel_state.trigger_trie else None
+	if matched is not None:
+		profile, text = matched
+	elif channel_state.trigger_required:
+		return
 
 	sanitized_message = _sanitize_text(text)
 	if not sanitized_message:
 		return
 
-	sanitized_username = _sanitize_text(username) if username else ""
+	text_filter = _text_filter
+	spoken_message = text_filter.apply(sanitized_message)
+	if not spoken_message:
+		return
+
+	sanitized_username = _sanitize_text(display_name) if display_name else ""
+	if not sanitized_username and username:
+		sanitized_username = _sanitize_text(username)
+	if sanitized_username and text_filter.apply(sanitized_username) is None:
+		return
 	user_key = username.lower() if username else ""
 
-	if user_key and _is_user_on_cooldown(user_key):
+	if user_key and _is_user_on_cooldown(channel_state, user_key):
 		return
 
 	if include_username and sanitized_username:
-		speak_text = f"{sanitized_username} says: {sanitized_message}"
+		speak_text = f"{sanitized_username} says: {spoken_message}"
 	else:
-		speak_text = sanitized_message
+		speak_text = spoken_message
 
 	if len(speak_text) > max_tts_length:
 		speak_text = f"{speak_text[: max_tts_length - 3]}..."
@@ -549,54 +2502,654 @@ def _handle_line(sock: socket.socket, line: str):
 		display_text = f"{sanitized_username}: {sanitized_message}"
 	else:
 		display_text = sanitized_message
+	if len(_channels) > 1:
+		display_text = f"[{channel_state.name}] {display_text}"
 
 	if len(display_text) > max_tts_length:
 		display_text = f"{display_text[: max_tts_length - 3]}..."
 
 	pitch_value = _pitch_for_username(username)
 
+	queued = QueuedMessage(
+		speak_text,
+		pitch_value,
+		display_text,
+		user_key,
+		_priority_for_tags(message.tags),
+		time.monotonic(),
+		profile=profile,
+		channel=channel_state.name,
+		received_at=connection.received_at,
+	)
+	if _enqueue_message(queued, "chat message") and user_key:
+		channel_state.user_last_trigger.touch(user_key, per_user_timeout)
+
+
+def _enqueue_message(message: QueuedMessage, kind: str) -> bool:
+	# Queue a message, shedding load per the overflow policy; False if it was dropped
+	over_latency = max_speech_latency > 0.0 and _estimated_wait_seconds() > max_speech_latency
+	channel_full = _message_queue.qsize(message.channel) >= _message_queue.maxsize
+	if over_latency or channel_full:
+		# A full channel only sheds its own messages; latency is shared by all channels
+		if not _shed_for_incoming(message.channel if channel_full else None):
+			_pipeline_metrics.count("rejected")
+			_reject_log.warning(f"Speech backlog full; dropping {kind}")
+			return False
+
 	try:
-		_message_queue.put_nowait(QueuedMessage(speak_text, pitch_value, display_text))
-		if user_key:
-			_user_last_trigger[user_key] = time.time()
+		_message_queue.put_nowait(message)
 	except queue.Full:
-		obs.script_log(obs.LOG_WARNING, "Message queue full; dropping chat message")
+		_pipeline_metrics.count("rejected")
+		_reject_log.warning(f"Message queue full; dropping {kind}")
+		return False
+	_pipeline_metrics.count("queued")
+	_request_prefetch()
+	_post_main_event("queued")
+	return True
 
 
-def _sanitize_text(text: str) -> str:
-	filtered = ''.join(ch if 32 <= ord(ch) < 127 else ' ' for ch in text)
-	filtered = ' '.join(filtered.split())
-	return filtered.strip()
+def _shed_for_incoming(channel: Optional[str] = None) -> bool:
+	# Make room for one incoming message; False means the incoming one loses
+	global _skipped_since_spoken
 
+	if overflow_policy in (OVERFLOW_DROP_OLDEST, OVERFLOW_SUMMARIZE):
+		dropped = _message_queue.drop_oldest(channel)
+	elif overflow_policy == OVERFLOW_RANDOM:
+		# Every queued message and the incoming one are equally likely to go
+		if _shed_random.randrange(_message_queue.qsize(channel) + 1) == 0:
+			dropped = None
+		else:
+			dropped = _message_queue.drop_random(_shed_random, channel)
+	else:
+		dropped = None
 
-def _is_user_on_cooldown(user_key: str) -> bool:
-	if per_user_timeout <= 0.0:
+	_skipped_since_spoken += 1
+	if dropped is None:
 		return False
+	_pipeline_metrics.count("dropped")
+	_shed_log.warning("Speech backlog full; dropping queued messages")
+	return True
 
-	last_time = _user_last_trigger.get(user_key)
-	if last_time is None:
-		return False
 
-	now = time.time()
-	if now - last_time >= per_user_timeout:
-		_user_last_trigger.pop(user_key, None)
+def _expire_stale_messages():
+	global _skipped_since_spoken
+
+	if max_speech_latency <= 0.0:
+		return
+	expired = _message_queue.expire(time.monotonic() - max_speech_latency)
+	if expired:
+		_skipped_since_spoken += expired
+		_pipeline_metrics.count("expired", expired)
+		_expire_log.warning(f"Dropped {expired} messages older than {max_speech_latency:g} seconds")
+
+
+def _estimated_wait_seconds() -> float:
+	slot = _slot_seconds(_effective_speech_rate(), _effective_speak_interval())
+	return _message_queue.qsize() * slot
+
+
+def _slot_seconds(rate: int, interval: float) -> float:
+	# Time one message occupies: the interval, or its speech if that is longer
+	speech = _average_speech_work / max(1, rate)
+	return max(interval, speech)
+
+
+def _update_adaptive_speed():
+	# Move the speed level toward the current backlog pressure, quickly up and slowly down
+	global _adaptive_level, _adaptive_updated
+
+	now = time.monotonic()
+	elapsed = now - _adaptive_updated if _adaptive_updated else 0.0
+	_adaptive_updated = now
+	if not adaptive_speed:
+		_adaptive_level = 0.0
+		return
+
+	depth = _message_queue.qsize()
+	pressure = 0.0
+	if depth:
+		oldest = _message_queue.oldest_enqueued_at()
+		oldest_age = 0.0 if oldest is None else now - oldest
+		load = max(depth * _slot_seconds(speech_rate, speak_interval), oldest_age)
+		low = adaptive_target_seconds * 0.25
+		pressure = min(1.0, max(0.0, (load - low) / (adaptive_target_seconds - low)))
+
+	time_constant = ADAPTIVE_RISE_SECONDS if pressure > _adaptive_level else ADAPTIVE_RELAX_SECONDS
+	gain = 1.0 - math.exp(-elapsed / time_constant)
+	_adaptive_level += (pressure - _adaptive_level) * gain
+	if _adaptive_level < 0.01:
+		_adaptive_level = 0.0
+
+
+def _effective_speech_rate() -> int:
+	if _adaptive_level <= 0.0:
+		return speech_rate
+	top = max(speech_rate, adaptive_max_rate)
+	rate = speech_rate + _adaptive_level * (top - speech_rate)
+	# Quantize so audio rendered ahead of time still matches at dispatch
+	return int(round(rate / ADAPTIVE_RATE_STEP) * ADAPTIVE_RATE_STEP)
+
+
+def _effective_speak_interval() -> float:
+	if _adaptive_level <= 0.0:
+		return speak_interval
+	bottom = min(speak_interval, adaptive_min_interval)
+	return speak_interval - _adaptive_level * (speak_interval - bottom)
+
+
+def _adaptive_status() -> dict:
+	return {
+		"effective_speech_rate": _effective_speech_rate(),
+		"effective_speak_interval_seconds": _effective_speak_interval(),
+		"estimated_drain_seconds": _estimated_wait_seconds(),
+	}
+
+
+def _on_log_adaptive_status_clicked(props, prop):
+	if _speech_process.running:
+		_speech_process.send("log_adaptive_status")
 		return False
+	status = _adaptive_status()
+	obs.script_log(
+		obs.LOG_INFO,
+		f"Speech speed: rate {status['effective_speech_rate']} (base {speech_rate}), "
+		f"interval {status['effective_speak_interval_seconds']:.2f} s (base {speak_interval:.2f} s), "
+		f"{_message_queue.qsize()} queued, estimated drain {status['estimated_drain_seconds']:.1f} s",
+	)
+	return False
+
+
+def _with_skip_summary(message: QueuedMessage) -> QueuedMessage:
+	global _skipped_since_spoken
+
+	skipped = _skipped_since_spoken
+	_skipped_since_spoken = 0
+	if overflow_policy != OVERFLOW_SUMMARIZE or skipped <= 0:
+		return message
+	noun = "message" if skipped == 1 else "messages"
+	summary = f", and {skipped} more {noun}"
+	parts = message.parts
+	if parts:
+		parts = parts[:-1] + (parts[-1]._replace(speak_text=parts[-1].speak_text + summary),)
+	return message._replace(
+		speak_text=message.speak_text + summary,
+		display_text=f"{message.display_text} (+{skipped} more)",
+		parts=parts,
+	)
 
-	return True
 
+def _is_short_message(message: QueuedMessage) -> bool:
+	return not message.parts and len(message.speak_text) <= batch_max_characters
 
-def _handle_join(line: str):
-	if not greet_users:
+
+def _collect_batch(first: QueuedMessage) -> QueuedMessage:
+	# Under a backlog, combine consecutive short messages into one queue slot
+	if not batch_short_messages or not _is_short_message(first):
+		return first
+	if _message_queue.qsize() + 1 < batch_backlog_threshold:
+		return first
+
+	parts = [first]
+	while len(parts) < batch_max_messages:
+		following = _message_queue.get_if(_is_short_message)
+		if following is None:
+			break
+		parts.append(following)
+
+	if len(parts) == 1:
+		return first
+	return first._replace(
+		speak_text=" ".join(part.speak_text for part in parts),
+		display_text="\n".join(part.display_text for part in parts),
+		parts=tuple(parts),
+	)
+
+
+class _TriggerTrie:
+	"""Case-insensitive prefix trie of trigger words and their voice profiles.
+
+	match() walks at most as many characters as the longest trigger, so
+	checking a message costs the same however many triggers there are.
+	"""
+
+	def __init__(self, triggers: dict[str, Optional[VoiceProfile]]):
+		self._root: dict = {}
+		for word, profile in triggers.items():
+			node = self._root
+			for char in word.lower():
+				node = node.setdefault(char, {})
+			# None cannot clash with a character key, so it marks a complete trigger
+			node[None] = profile
+
+	def __bool__(self) -> bool:
+		return bool(self._root)
+
+	def match(self, text: str) -> Optional[tuple[Optional[VoiceProfile], str]]:
+		# Returns (profile, text after the trigger) for the longest trigger followed by whitespace
+		node = self._root
+		found = None
+		for index, char in enumerate(text):
+			node = node.get(char.lower())
+			if node is None:
+				break
+			end = index + 1
+			if None in node and end < len(text) and text[end].isspace():
+				found = (node[None], end)
+		if found is None:
+			return None
+
+		profile, end = found
+		rest = text[end:].lstrip()
+		if not rest:
+			return None
+		return profile, rest
+
+
+class _ChannelState:
+	"""Trigger words and cooldown tables of one joined channel."""
+
+	def __init__(self, name: str):
+		self.name = name
+		self.trigger_trie = _TriggerTrie({})
+		# Only a trigger word gates chat; voice triggers just pick a voice
+		self.trigger_required = False
+		self.user_last_trigger = _ExpiringMap(COOLDOWN_TABLE_MAX_ENTRIES)
+		self.user_last_greet = _ExpiringMap(COOLDOWN_TABLE_MAX_ENTRIES)
+		# Joins waiting for the combined greeting: user key -> (username, spoken name, received_at)
+		self.pending_greets: dict[str, tuple[str, str, float]] = {}
+		self.greet_deadline = 0.0
+
+	def clear_cooldowns(self):
+		self.user_last_trigger.clear()
+		self.user_last_greet.clear()
+
+	def clear_pending_greets(self):
+		self.pending_greets = {}
+		self.greet_deadline = 0.0
+
+
+_channels: dict[str, _ChannelState] = {}
+_channel_source: tuple[str, str, str] = ("", "", "")
+# Space-separated channel groups in the channel field, and those already warned about
+_unseparated_channels: tuple[str, ...] = ()
+_warned_channel_groups: set[str] = set()
+
+
+def _parse_channel_list(text: str, unseparated: Optional[list] = None) -> list[tuple[str, str]]:
+	# "#alice, bob !say" -> [("#alice", ""), ("#bob", "!say")]
+	entries = []
+	for entry in text.replace("\n", ",").split(","):
+		words = entry.split()
+		if not words:
+			continue
+		# "#alice #bob" is two channels missing a comma, not #alice with trigger "#bob"
+		names = [words.pop(0)]
+		while words and words[0].startswith("#"):
+			names.append(words.pop(0))
+		if len(names) > 1 and unseparated is not None:
+			unseparated.append(" ".join(names))
+		channel_trigger = " ".join(words)
+		for index, name in enumerate(names):
+			name = name.lower()
+			if not name.startswith("#"):
+				name = f"#{name}"
+			entries.append((name, channel_trigger if index == len(names) - 1 else ""))
+	return entries
+
+
+def _configure_channels():
+	# Only recompile (and re-warn about bad lines) when channels or triggers change
+	global _channels, _channel_source
+
+	source = (channel, trigger_word, trigger_profiles)
+	if source == _channel_source:
+		return
+	_channel_source = source
+
+	# Runs once an edit has settled, so half-typed names are never reported
+	for group in _unseparated_channels:
+		if group not in _warned_channel_groups:
+			_warned_channel_groups.add(group)
+			obs.script_log(
+				obs.LOG_WARNING,
+				f"Channels '{group}' are not separated by commas; reading them as separate channels",
+			)
+
+	profiles = _parse_trigger_profiles(trigger_profiles)
+	with _settings_lock:
+		channels = {}
+		for name, channel_trigger in _parse_channel_list(channel):
+			# Channels that stay configured keep their cooldown tables
+			state = _channels.get(name) or _ChannelState(name)
+			triggers = dict(profiles)
+			word = channel_trigger or trigger_word
+			if word:
+				triggers.setdefault(word, None)
+			state.trigger_trie = _TriggerTrie(triggers)
+			state.trigger_required = bool(word)
+			channels[name] = state
+		_channels = channels
+
+
+def _clear_cooldowns():
+	for state in _channels.values():
+		state.clear_cooldowns()
+
+
+def _clear_pending_greets():
+	# Joins collected before a drain or reconnect must not be greeted afterwards
+	with _settings_lock:
+		for state in _channels.values():
+			state.clear_pending_greets()
+
+
+def _parse_trigger_profiles(text: str) -> dict[str, VoiceProfile]:
+	# Lines look like "!robot = voice=en+m3 rate=200 pitch=20"; every option is optional
+	profiles = {}
+	for line in text.splitlines():
+		line = line.strip()
+		if not line or line.startswith("#"):
+			continue
+		word, _, options = line.partition("=")
+		word = word.strip()
+		fields = dict(option.partition("=")[::2] for option in options.split())
+		try:
+			if not word or any(char.isspace() for char in word):
+				raise ValueError("trigger must be a single word")
+			pitch = fields.get("pitch")
+			profiles[word] = VoiceProfile(
+				voice=fields.get("voice", ""),
+				rate=max(0, int(fields.get("rate") or 0)),
+				pitch=None if pitch is None else max(0, min(99, int(pitch))),
+			)
+		except ValueError as err:
+			obs.script_log(obs.LOG_WARNING, f"Ignoring voice trigger '{line}': {err}")
+	return profiles
+
+
+def _priority_for_tags(tags: dict[str, str]) -> str:
+	if tags.get("mod") == "1" or tags.get("subscriber") == "1":
+		return PRIORITY_PRIVILEGED
+	badges = tags.get("badges")
+	if badges:
+		for badge in badges.split(","):
+			if badge.partition("/")[0] in PRIVILEGED_BADGES:
+				return PRIORITY_PRIVILEGED
+	return PRIORITY_NORMAL
+
+
+def _sanitize_text(text: str) -> str:
+	if not (text.isascii() and text.isprintable()):
+		text = text.translate(_sanitize_table)
+	return " ".join(text.split())
+
+
+# Letters NFKD leaves alone but that have a common ASCII spelling
+_TRANSLITERATIONS = {
+	"ß": "ss",
+	"ẞ": "SS",
+	"æ": "ae",
+	"Æ": "AE",
+	"œ": "oe",
+	"Œ": "OE",
+	"ø": "o",
+	"Ø": "O",
+	"ł": "l",
+	"Ł": "L",
+	"đ": "d",
+	"Đ": "D",
+	"ð": "d",
+	"Ð": "D",
+	"þ": "th",
+	"Þ": "Th",
+	"ı": "i",
+	"‘": "'",
+	"’": "'",
+	"‚": "'",
+	"“": '"',
+	"”": '"',
+	"„": '"',
+	"–": "-",
+	"—": "-",
+}
+
+
+class _SanitizeTable(dict):
+	"""str.translate table that keeps printable ASCII and blanks everything else.
+
+	Printable ASCII maps to itself up front. Other code points are resolved
+	on first sight in __missing__ and cached: with transliteration they keep
+	their ASCII spelling (NFKD base letters plus _TRANSLITERATIONS), otherwise
+	they become a space like before.
+	"""
+
+	def __init__(self, transliterate: bool):
+		super().__init__((codepoint, codepoint) for codepoint in range(32, 127))
+		self.transliterate = transliterate
+
+	def __missing__(self, codepoint: int) -> str:
+		value = self._resolve(chr(codepoint))
+		# Bound the table in case someone pastes every code point there is
+		if len(self) < SANITIZE_TABLE_MAX_ENTRIES:
+			self[codepoint] = value
+		return value
+
+	def _resolve(self, char: str) -> str:
+		if not self.transliterate or ord(char) < 128:
+			return " "
+		if char in _TRANSLITERATIONS:
+			return _TRANSLITERATIONS[char]
+		if unicodedata.combining(char):
+			# A stray combining accent belongs to the letter before it
+			return ""
+		decomposed = unicodedata.normalize("NFKD", char)
+		ascii_text = "".join(part for part in decomposed if 32 <= ord(part) < 127)
+		return ascii_text or " "
+
+
+_sanitize_table = _SanitizeTable(transliterate_text)
+
+
+def _configure_sanitizer():
+	global _sanitize_table
+
+	if _sanitize_table.transliterate != transliterate_text:
+		_sanitize_table = _SanitizeTable(transliterate_text)
+
+
+class _PhraseMatcher:
+	"""Aho-Corasick automaton over lowercase phrases.
+
+	find() reports every phrase occurrence in one pass over the text,
+	however many phrases were compiled in.
+	"""
+
+	def __init__(self, phrases: dict[str, object]):
+		self._goto: list[dict[str, int]] = [{}]
+		self._fail: list[int] = [0]
+		self._output: list[list[tuple[int, object]]] = [[]]
+
+		for phrase, value in phrases.items():
+			node = 0
+			for char in phrase:
+				next_node = self._goto[node].get(char)
+				if next_node is None:
+					next_node = len(self._goto)
+					self._goto[node][char] = next_node
+					self._goto.append({})
+					self._fail.append(0)
+					self._output.append([])
+				node = next_node
+			self._output[node].append((len(phrase), value))
+
+		# Breadth-first so every fail target is finished before it is used
+		pending = list(self._goto[0].values())
+		for node in pending:
+			for char, child in self._goto[node].items():
+				fallback = self._fail[node]
+				while fallback and char not in self._goto[fallback]:
+					fallback = self._fail[fallback]
+				self._fail[child] = self._goto[fallback].get(char, 0)
+				self._output[child] = self._output[child] + self._output[self._fail[child]]
+				pending.append(child)
+
+	def find(self, text: str) -> list[tuple[int, int, object]]:
+		matches = []
+		goto = self._goto
+		fail = self._fail
+		output = self._output
+		node = 0
+		for index, char in enumerate(text):
+			while node and char not in goto[node]:
+				node = fail[node]
+			node = goto[node].get(char, 0)
+			for length, value in output[node]:
+				matches.append((index + 1 - length, index + 1, value))
+		return matches
+
+
+class _TextFilter:
+	"""Blocked words and pronunciation replacements, matched in one pass.
+
+	Terms match whole words, case-insensitively; a term ending in "*" also
+	swallows the rest of the word it starts (e.g. "https://*"). apply()
+	returns None when a blocked term is present, otherwise the text with
+	replacements applied.
+	"""
+
+	_BLOCK = object()
+
+	def __init__(self, blocked_terms: list[str], replacements: dict[str, str]):
+		# Each phrase carries (swallows rest of word, replacement or _BLOCK)
+		phrases: dict[str, tuple[bool, object]] = {}
+		for term, replacement in replacements.items():
+			phrases[term.rstrip("*")] = (term.endswith("*"), replacement)
+		for term in blocked_terms:
+			phrases[term.rstrip("*")] = (term.endswith("*"), self._BLOCK)
+		phrases.pop("", None)
+
+		self.blocked_count = len(blocked_terms)
+		self.replacement_count = len(replacements)
+		self._matcher = _PhraseMatcher(phrases) if phrases else None
+
+	def apply(self, text: str) -> Optional[str]:
+		if self._matcher is None:
+			return text
+
+		lowered = text.lower()
+		candidates = []
+		for start, end, (wildcard, value) in self._matcher.find(lowered):
+			if start > 0 and lowered[start - 1].isalnum():
+				continue
+			if wildcard:
+				while end < len(lowered) and not lowered[end].isspace():
+					end += 1
+			elif end < len(lowered) and lowered[end].isalnum():
+				continue
+			if value is self._BLOCK:
+				return None
+			candidates.append((start, -end, value))
+
+		if not candidates:
+			return text
+
+		# Leftmost, then longest, non-overlapping replacements win
+		candidates.sort()
+		pieces = []
+		position = 0
+		for start, negative_end, replacement in candidates:
+			if start < position:
+				continue
+			pieces.append(text[position:start])
+			pieces.append(replacement)
+			position = -negative_end
+		pieces.append(text[position:])
+		return " ".join("".join(pieces).split())
+
+
+def _read_blocklist(path: str) -> list[str]:
+	# One term per line; blank lines and lines starting with # are ignored
+	terms = []
+	for line in _read_filter_lines(path):
+		term = _sanitize_text(line).lower()
+		if term:
+			terms.append(term)
+	return terms
+
+
+def _read_replacements(path: str) -> dict[str, str]:
+	# One "term = spoken text" rule per line; blank lines and # comments are ignored
+	replacements = {}
+	for line in _read_filter_lines(path):
+		term, separator, replacement = line.partition("=")
+		term = _sanitize_text(term).lower()
+		if separator and term:
+			replacements[term] = _sanitize_text(replacement)
+	return replacements
+
+
+def _read_filter_lines(path: str) -> list[str]:
+	if not path:
+		return []
+	with open(path, encoding="utf-8", errors="replace") as handle:
+		return [line.strip() for line in handle if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _file_mtime(path: str) -> Optional[float]:
+	if not path:
+		return None
+	try:
+		return os.stat(path).st_mtime
+	except OSError:
+		return None
+
+
+_text_filter = _TextFilter([], {})
+_text_filter_sources: tuple = ()
+_text_filter_checked: float = 0.0
+
+
+def _configure_text_filter():
+	# (Re)build the filter when a list file was changed, added or removed
+	global _text_filter, _text_filter_sources
+
+	sources = tuple((path, _file_mtime(path)) for path in (blocklist_file, replacements_file))
+	if sources == _text_filter_sources:
+		return
+	_text_filter_sources = sources
+
+	try:
+		text_filter = _TextFilter(_read_blocklist(blocklist_file), _read_replacements(replacements_file))
+	except OSError as err:
+		obs.script_log(obs.LOG_WARNING, f"Failed to load word lists: {err}")
 		return
 
-	prefix, _, _ = line.partition(" JOIN ")
-	if not prefix:
+	_text_filter = text_filter
+	if text_filter.blocked_count or text_filter.replacement_count:
+		obs.script_log(
+			obs.LOG_INFO,
+			f"Loaded {text_filter.blocked_count} blocked terms and {text_filter.replacement_count} replacements",
+		)
+
+
+def _maybe_reload_text_filter(now: float):
+	global _text_filter_checked
+
+	if now - _text_filter_checked < FILTER_RELOAD_CHECK_SECONDS:
 		return
+	_text_filter_checked = now
+	_configure_text_filter()
+
 
-	username = prefix.split("!")[0]
-	if username.startswith(":"):
-		username = username[1:]
+def _is_user_on_cooldown(channel_state: _ChannelState, user_key: str) -> bool:
+	return channel_state.user_last_trigger.is_active(user_key, per_user_timeout)
 
+
+def _handle_join(message: _IrcMessage, channel_state: _ChannelState, received_at: float = 0.0):
+	if not greet_users:
+		return
+
+	username = message.nick
 	user_key = username.lower().strip()
 	if not user_key:
 		return
@@ -604,14 +3157,44 @@ def _handle_join(line: str):
 	if nickname and user_key == nickname.lower():
 		return
 
-	if _is_user_on_greet_cooldown(user_key):
+	if _is_user_on_greet_cooldown(channel_state, user_key) or user_key in channel_state.pending_greets:
 		return
 
 	sanitized_username = _sanitize_text(username)
-	if not sanitized_username:
+	if not sanitized_username or _text_filter.apply(sanitized_username) is None:
+		return
+
+	# Joins arrive in bursts; collect them and greet everyone in one message
+	if not channel_state.pending_greets:
+		channel_state.greet_deadline = time.monotonic() + greet_batch_seconds
+	channel_state.pending_greets[user_key] = (username, sanitized_username, received_at)
+	if greet_batch_seconds <= 0.0:
+		_flush_greetings(channel_state)
+
+
+def _flush_due_greetings(now: float) -> float:
+	# Greet every channel whose collection window has closed; returns seconds until the next one does
+	next_deadline = math.inf
+	with _settings_lock:
+		for channel_state in _channels.values():
+			if not channel_state.pending_greets:
+				continue
+			if now >= channel_state.greet_deadline:
+				_flush_greetings(channel_state)
+			else:
+				next_deadline = min(next_deadline, channel_state.greet_deadline - now)
+	return next_deadline
+
+
+def _flush_greetings(channel_state: _ChannelState):
+	pending = channel_state.pending_greets
+	channel_state.pending_greets = {}
+	if not pending or not greet_users:
 		return
 
-	greet_text = greet_message.replace("{name}", sanitized_username)
+	greeted = list(pending.values())
+	names = [spoken_name for _, spoken_name, _ in greeted]
+	greet_text = greet_message.replace("{name}", _join_greeted_names(names))
 	sanitized_greet = _sanitize_text(greet_text)
 	if not sanitized_greet:
 		return
@@ -620,30 +3203,40 @@ def _handle_join(line: str):
 	if len(final_text) > max_tts_length:
 		final_text = f"{final_text[: max_tts_length - 3]}..."
 
-	pitch_value = _pitch_for_username(username)
+	first_username = greeted[0][0]
+	received_times = [received_at for _, _, received_at in greeted if received_at]
+	queued = QueuedMessage(
+		final_text,
+		_pitch_for_username(first_username),
+		final_text,
+		next(iter(pending)),
+		PRIORITY_GREET,
+		time.monotonic(),
+		channel=channel_state.name,
+		received_at=min(received_times, default=0.0),
+	)
+	if _enqueue_message(queued, "greet message"):
+		# Cooldowns stay per user: everyone named (or counted) was greeted
+		timeout = _greet_timeout_seconds()
+		for user_key in pending:
+			channel_state.user_last_greet.touch(user_key, timeout)
 
-	try:
-		_message_queue.put_nowait(QueuedMessage(final_text, pitch_value, final_text))
-		_user_last_greet[user_key] = time.time()
-	except queue.Full:
-		obs.script_log(obs.LOG_WARNING, "Message queue full; dropping greet message")
 
+def _join_greeted_names(names: list[str]) -> str:
+	# ["A", "B", "C"] -> "A, B and C"; longer lists end in "and N others"
+	if len(names) == 1:
+		return names[0]
+	if len(names) <= GREET_BATCH_NAMES + 1:
+		return f"{', '.join(names[:-1])} and {names[-1]}"
+	return f"{', '.join(names[:GREET_BATCH_NAMES])} and {len(names) - GREET_BATCH_NAMES} others"
 
-def _is_user_on_greet_cooldown(user_key: str) -> bool:
-	timeout_seconds = max(0.0, greet_timeout_minutes * 60.0)
-	if timeout_seconds <= 0.0:
-		return False
 
-	last_time = _user_last_greet.get(user_key)
-	if last_time is None:
-		return False
+def _is_user_on_greet_cooldown(channel_state: _ChannelState, user_key: str) -> bool:
+	return channel_state.user_last_greet.is_active(user_key, _greet_timeout_seconds())
 
-	now = time.time()
-	if now - last_time >= timeout_seconds:
-		_user_last_greet.pop(user_key, None)
-		return False
 
-	return True
+def _greet_timeout_seconds() -> float:
+	return max(0.0, greet_timeout_minutes * 60.0)
 
 
 def _pitch_for_username(username: str) -> int:
@@ -667,54 +3260,987 @@ def _pitch_for_username(username: str) -> int:
 
 
 def dispatch_tts():
-	global _tts_thread, _last_speech_time
+	global _last_speech_time
 
 	if _stop_event.is_set() or not enabled:
 		return
 
-	if _tts_thread is not None and _tts_thread.is_alive():
+	if _is_speaking():
 		return
 
+	_update_adaptive_speed()
 	now = time.time()
-	if now - _last_speech_time < speak_interval:
+	if now - _last_speech_time < _effective_speak_interval():
 		return
 
+	_expire_stale_messages()
 	try:
 		message = _message_queue.get_nowait()
 	except queue.Empty:
 		return
 
+	message = _with_skip_summary(_collect_batch(message))._replace(dispatched_at=time.monotonic())
 	_prepare_display(message.display_text)
+	_request_prefetch()
 	_last_speech_time = now
-	_tts_thread = threading.Thread(
-		target=_run_tts,
-		args=(message.speak_text, message.pitch_value),
-		name="TwitchTTSThread",
-		daemon=True,
-	)
-	_tts_thread.start()
-
-
-def _run_tts(speak_text: str, pitch_value: int):
+	_tts_worker.submit(message)
+
+
+def _is_speaking() -> bool:
+	return _tts_worker.busy
+
+
+class _TtsWorker:
+	"""Long-lived playback thread fed one message at a time.
+
+	dispatch_tts hands messages over through a condition variable. The
+	worker posts tts_started/tts_finished main-thread events with monotonic
+	timestamps, and the utterance in progress can be cancelled.
+	"""
+
+	def __init__(self):
+		self._condition = threading.Condition()
+		self._pending: Optional[QueuedMessage] = None
+		self._busy = False
+		self._stopping = False
+		self._cancelled = threading.Event()
+		self._thread: Optional[threading.Thread] = None
+
+	@property
+	def busy(self) -> bool:
+		return self._busy
+
+	def submit(self, message: QueuedMessage):
+		with self._condition:
+			if self._thread is None or not self._thread.is_alive():
+				self._stopping = False
+				self._thread = threading.Thread(target=self._run, name="TwitchTTSThread", daemon=True)
+				self._thread.start()
+			self._pending = message
+			self._busy = True
+			self._condition.notify()
+
+	def cancel_current(self):
+		with self._condition:
+			if not self._busy:
+				return
+			if self._pending is not None:
+				# Not picked up yet, so the worker is idle
+				self._pending = None
+				self._busy = False
+				return
+			self._cancelled.set()
+		engine = _tts_engine
+		if engine is not None:
+			engine.cancel()
+
+	def stop(self, timeout: float):
+		with self._condition:
+			self._stopping = True
+			self._condition.notify()
+		self.cancel_current()
+		_process_supervisor.terminate(_process_supervisor.PLAYBACK)
+		thread = self._thread
+		if thread is not None:
+			thread.join(timeout=timeout)
+		self._thread = None
+
+	def _run(self):
+		while True:
+			with self._condition:
+				while self._pending is None and not self._stopping:
+					self._condition.wait()
+				if self._stopping:
+					self._busy = False
+					return
+				message = self._pending
+				self._pending = None
+				self._cancelled.clear()
+
+			started = time.monotonic()
+			_post_main_event("tts_started", started, message)
+			rate, completed = _run_tts(message, self._cancelled)
+			finished = time.monotonic()
+			if completed:
+				_pipeline_metrics.record_spoken(message, started, finished)
+
+			with self._condition:
+				if self._pending is None:
+					self._busy = False
+			_post_main_event("tts_finished", finished, (started, rate, len(message.parts) or 1, completed))
+
+
+_tts_worker = _TtsWorker()
+
+
+def _run_tts(message: QueuedMessage, cancelled: threading.Event) -> tuple[int, bool]:
+	# Speak one message on the playback worker; returns the rate it used and
+	# whether it played to the end (False when skipped or when synthesis failed)
+	rate = speech_rate
 	try:
-		pitch_arg = _espeak_pitch_value(pitch_value)
-		subprocess.run([
-			"espeak-ng",
-			"-s",
-			str(speech_rate),
-			"-p",
-			str(pitch_arg),
-			speak_text,
-		], check=False)
+		engine = _get_tts_engine()
+		# A skip after this point reaches the engine; one before it is in cancelled
+		engine.clear_cancel()
+		if cancelled.is_set():
+			return rate, False
+		if message.parts:
+			return _play_batch(engine, message.parts, cancelled)
+		speak_text, rate, pitch_arg, voice = _synthesis_params(message)
+		audio = _take_prerendered(_AudioCache.make_key(speak_text, pitch_arg, rate, voice))
+		if audio is None:
+			if _audio_cache is None or not engine.can_play_pcm:
+				engine.speak(speak_text, rate, pitch_arg, voice)
+				return rate, not cancelled.is_set()
+			audio = _render_cached(engine, speak_text, rate, pitch_arg, voice)
+		if not cancelled.is_set():
+			engine.play(audio)
 	except FileNotFoundError:
 		obs.script_log(obs.LOG_ERROR, "espeak-ng not found; install it or adjust PATH")
+		return rate, False
 	except Exception as err:
 		obs.script_log(obs.LOG_WARNING, f"espeak-ng error: {err}")
+		return rate, False
+	return rate, not cancelled.is_set()
+
+
+def _play_batch(engine, parts: tuple, cancelled: threading.Event) -> tuple[int, bool]:
+	# Render each speaker with their own pitch and play them as one utterance
+	rate = speech_rate
+	if not engine.can_play_pcm:
+		for part in parts:
+			if cancelled.is_set():
+				break
+			speak_text, rate, pitch_arg, voice = _synthesis_params(part)
+			engine.speak(speak_text, rate, pitch_arg, voice)
+		return rate, not cancelled.is_set()
+
+	pieces = []
+	sample_rate = 0
+	for part in parts:
+		speak_text, rate, pitch_arg, voice = _synthesis_params(part)
+		audio = _take_prerendered(_AudioCache.make_key(speak_text, pitch_arg, rate, voice))
+		if audio is None:
+			audio = _render_cached(engine, speak_text, rate, pitch_arg, voice)
+		if not audio.samples:
+			continue
+		if pieces:
+			pieces.append(bytes(int(audio.sample_rate * BATCH_GAP_SECONDS) * 2))
+		pieces.append(audio.samples)
+		sample_rate = audio.sample_rate
+
+	if pieces and not cancelled.is_set():
+		engine.play(_PcmAudio(b"".join(pieces), sample_rate))
+	return rate, not cancelled.is_set()
+
+
+def _synthesis_params(message: QueuedMessage) -> tuple[str, int, int, str]:
+	# Everything that determines the rendered audio: text, rate, pitch and voice
+	with _settings_lock:
+		rate = _effective_speech_rate()
+		pitch = _espeak_pitch_value(message.pitch_value)
+		base_rate = speech_rate
+	profile = message.profile
+	if profile is None:
+		return message.speak_text, rate, pitch, ""
+
+	if profile.rate:
+		# Keep any adaptive speed-up on top of the profile's own rate
+		rate = profile.rate + rate - base_rate
+	if profile.pitch is not None:
+		pitch = profile.pitch
+	return message.speak_text, rate, pitch, profile.voice
+
+
+def _peek_queued(count: int) -> list[QueuedMessage]:
+	return _message_queue.peek(count)
+
+
+def _request_prefetch():
+	global _prefetch_requested
+
+	with _prefetch_condition:
+		_prefetch_requested = True
+		_prefetch_condition.notify()
+
+
+def _take_prerendered(key: str) -> Optional[_PcmAudio]:
+	with _prerendered_lock:
+		return _prerendered.pop(key, None)
+
+
+def _prefetch_worker():
+	# Render the next queued messages while the current one is still playing
+	global _prefetch_requested
+
+	while True:
+		with _prefetch_condition:
+			while not _prefetch_requested and not _prefetch_stopping:
+				_prefetch_condition.wait()
+			if _prefetch_stopping:
+				return
+			_prefetch_requested = False
+
+		if lookahead_messages <= 0:
+			continue
+
+		try:
+			engine = _get_tts_engine()
+			if not engine.can_play_pcm:
+				continue
+			with _settings_lock:
+				count = lookahead_messages
+				if batch_short_messages and _message_queue.qsize() >= batch_backlog_threshold:
+					# Dispatch may combine several short messages; render all of them
+					count = max(count, batch_max_messages)
+			for message in _peek_queued(count):
+				if _prefetch_stopping:
+					return
+				speak_text, rate, pitch_arg, voice = _synthesis_params(message)
+				key = _AudioCache.make_key(speak_text, pitch_arg, rate, voice)
+				with _prerendered_lock:
+					if key in _prerendered:
+						continue
+				audio = _render_cached(engine, speak_text, rate, pitch_arg, voice)
+				with _prerendered_lock:
+					_prerendered[key] = audio
+					# Never evict messages rendered in this same pass
+					while len(_prerendered) > max(4, count * 2):
+						_prerendered.popitem(last=False)
+		except Exception as err:
+			obs.script_log(obs.LOG_WARNING, f"Pre-synthesis failed: {err}")
+
+
+def _get_tts_engine():
+	# Create the synthesis engine once and keep it (and its voices) loaded
+	global _tts_engine
+
+	with _tts_engine_lock:
+		if _tts_engine is None:
+			_tts_engine = _create_tts_engine()
+			obs.script_log(obs.LOG_INFO, f"Using {_tts_engine.name} for speech synthesis")
+		return _tts_engine
+
+
+def _shutdown_tts_engine():
+	global _tts_engine
+
+	with _tts_engine_lock:
+		engine = _tts_engine
+		_tts_engine = None
+	if engine is not None:
+		engine.close()
+
+
+def _create_tts_engine():
+	# Prefer the in-process library, fall back to one espeak-ng process per message
+	library = _load_shared_library(ESPEAK_LIBRARY_NAMES)
+	pulse = _load_shared_library(PULSE_SIMPLE_LIBRARY_NAMES)
+	if library is not None and pulse is not None:
+		try:
+			return _LibEspeakEngine(library, _PulseAudioPlayer(pulse))
+		except Exception as err:
+			obs.script_log(obs.LOG_WARNING, f"libespeak-ng unavailable ({err}); using espeak-ng processes")
+	return _SubprocessEngine(_find_pcm_player_command())
+
+
+def _find_pcm_player_command() -> Optional[list[str]]:
+	# Raw PCM players the process fallback can use to play cached audio
+	if shutil.which("paplay"):
+		return ["paplay", "--raw", "--format=s16le", "--channels=1", "--rate={rate}"]
+	if shutil.which("aplay"):
+		return ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-c", "1", "-r", "{rate}"]
+	return None
+
+
+def _render_cached(engine, speak_text: str, rate: int, pitch: int, voice: str = "") -> _PcmAudio:
+	cache = _audio_cache
+	key = _AudioCache.make_key(speak_text, pitch, rate, voice)
+	if cache is not None:
+		audio = cache.get(key)
+		if audio is not None:
+			return audio
+
+	start = time.perf_counter()
+	audio = engine.render(speak_text, rate, pitch, voice)
+	if cache is not None and audio.samples:
+		cache.put(key, audio, time.perf_counter() - start)
+	return audio
+
+
+def _configure_audio_cache():
+	global _audio_cache
+
+	memory_bytes = cache_memory_mb * 1024 * 1024
+	disk_bytes = cache_disk_mb * 1024 * 1024
+	if memory_bytes <= 0 and disk_bytes <= 0:
+		_audio_cache = None
+		return
+
+	if _audio_cache is None:
+		_audio_cache = _AudioCache(memory_bytes, disk_bytes, _audio_cache_directory())
+	else:
+		_audio_cache.resize(memory_bytes, disk_bytes)
+
+
+def _audio_cache_directory() -> str:
+	base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+	return os.path.join(base, "obs-text-2-espeak")
+
+
+def _on_log_cache_stats_clicked(props, prop):
+	if _speech_process.running:
+		_speech_process.send("log_cache_stats")
+		return False
+	if _audio_cache is None:
+		obs.script_log(obs.LOG_INFO, "Speech cache is disabled")
+		return False
+
+	stats = _audio_cache.stats()
+	lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+	hit_rate = 0.0 if lookups == 0 else 100.0 * (lookups - stats["misses"]) / lookups
+	obs.script_log(
+		obs.LOG_INFO,
+		f"Speech cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+		f"{stats['misses']} misses ({hit_rate:.1f}% hit rate), "
+		f"{stats['memory_bytes'] / 1048576:.1f} MB in memory, {stats['disk_bytes'] / 1048576:.1f} MB on disk, "
+		f"~{stats['saved_synthesis_seconds']:.1f} s of synthesis saved",
+	)
+	return False
+
+
+class _AudioCache:
+	"""Two-tier LRU cache of rendered speech.
+
+	Entries are keyed by a hash of (text, pitch, rate, voice). The memory tier
+	holds PCM directly; the disk tier stores WAV files and survives restarts.
+	Both tiers evict least recently used entries once over their byte limit.
+	"""
+
+	def __init__(self, memory_limit: int, disk_limit: int, directory: str):
+		self._lock = threading.Lock()
+		self._memory: "OrderedDict[str, _PcmAudio]" = OrderedDict()
+		self._memory_bytes = 0
+		self._memory_limit = memory_limit
+		self._disk: "OrderedDict[str, int]" = OrderedDict()
+		self._disk_bytes = 0
+		self._disk_limit = disk_limit
+		self._directory = directory
+		self.memory_hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self._synthesis_seconds = 0.0
+		self._synthesized_bytes = 0
+		self._served_bytes = 0
+		self._load_disk_index()
+
+	@staticmethod
+	def make_key(speak_text: str, pitch: int, rate: int, voice: str) -> str:
+		material = f"{voice}\0{rate}\0{pitch}\0{speak_text}".encode("utf-8", errors="replace")
+		return hashlib.sha1(material).hexdigest()
+
+	def _path_for(self, key: str) -> str:
+		return os.path.join(self._directory, f"{key}.wav")
+
+	def _load_disk_index(self):
+		if self._disk_limit <= 0:
+			return
+		try:
+			os.makedirs(self._directory, exist_ok=True)
+			entries = []
+			with os.scandir(self._directory) as scan:
+				for entry in scan:
+					if entry.is_file() and entry.name.endswith(".wav"):
+						stat = entry.stat()
+						entries.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+		except OSError as err:
+			obs.script_log(obs.LOG_WARNING, f"Speech cache directory unavailable: {err}")
+			self._disk_limit = 0
+			return
+
+		for _, key, size in sorted(entries):
+			self._disk[key] = size
+			self._disk_bytes += size
+		self._evict_disk()
+
+	def resize(self, memory_limit: int, disk_limit: int):
+		with self._lock:
+			load_disk = self._disk_limit <= 0 < disk_limit
+			self._memory_limit = memory_limit
+			self._disk_limit = disk_limit
+			self._evict_memory()
+			if load_disk:
+				self._load_disk_index()
+			else:
+				self._evict_disk()
+
+	def get(self, key: str) -> Optional[_PcmAudio]:
+		with self._lock:
+			audio = self._memory.get(key)
+			if audio is not None:
+				self._memory.move_to_end(key)
+				self.memory_hits += 1
+				self._served_bytes += len(audio.samples)
+				return audio
+
+			if key in self._disk:
+				audio = self._read_disk_entry(key)
+				if audio is not None:
+					self._disk.move_to_end(key)
+					self._store_memory(key, audio)
+					self.disk_hits += 1
+					self._served_bytes += len(audio.samples)
+					return audio
+
+			self.misses += 1
+			return None
+
+	def put(self, key: str, audio: _PcmAudio, synthesis_seconds: float):
+		with self._lock:
+			self._synthesis_seconds += synthesis_seconds
+			self._synthesized_bytes += len(audio.samples)
+			self._store_memory(key, audio)
+			self._store_disk(key, audio)
+
+	def _store_memory(self, key: str, audio: _PcmAudio):
+		size = len(audio.samples)
+		if size > self._memory_limit:
+			return
+		previous = self._memory.pop(key, None)
+		if previous is not None:
+			self._memory_bytes -= len(previous.samples)
+		self._memory[key] = audio
+		self._memory_bytes += size
+		self._evict_memory()
+
+	def _evict_memory(self):
+		while self._memory and self._memory_bytes > self._memory_limit:
+			_, evicted = self._memory.popitem(last=False)
+			self._memory_bytes -= len(evicted.samples)
+
+	def _read_disk_entry(self, key: str) -> Optional[_PcmAudio]:
+		path = self._path_for(key)
+		try:
+			with wave.open(path, "rb") as reader:
+				audio = _PcmAudio(reader.readframes(reader.getnframes()), reader.getframerate())
+			os.utime(path)
+			return audio
+		except (OSError, EOFError, wave.Error):
+			self._disk_bytes -= self._disk.pop(key, 0)
+			return None
+
+	def _store_disk(self, key: str, audio: _PcmAudio):
+		if self._disk_limit <= 0 or key in self._disk:
+			return
+		path = self._path_for(key)
+		temp_path = f"{path}.tmp"
+		try:
+			with wave.open(temp_path, "wb") as writer:
+				writer.setnchannels(1)
+				writer.setsampwidth(2)
+				writer.setframerate(audio.sample_rate)
+				writer.writeframes(audio.samples)
+			os.replace(temp_path, path)
+			size = os.path.getsize(path)
+		except OSError as err:
+			obs.script_log(obs.LOG_WARNING, f"Failed to write speech cache entry: {err}")
+			return
+		self._disk[key] = size
+		self._disk_bytes += size
+		self._evict_disk()
+
+	def _evict_disk(self):
+		while self._disk and self._disk_bytes > self._disk_limit:
+			key, size = self._disk.popitem(last=False)
+			self._disk_bytes -= size
+			try:
+				os.remove(self._path_for(key))
+			except OSError:
+				pass
+
+	def stats(self) -> dict:
+		with self._lock:
+			seconds_per_byte = 0.0
+			if self._synthesized_bytes > 0:
+				seconds_per_byte = self._synthesis_seconds / self._synthesized_bytes
+			return {
+				"memory_hits": self.memory_hits,
+				"disk_hits": self.disk_hits,
+				"misses": self.misses,
+				"memory_bytes": self._memory_bytes,
+				"disk_bytes": self._disk_bytes,
+				"saved_synthesis_seconds": self._served_bytes * seconds_per_byte,
+			}
+
+
+def _load_shared_library(names):
+	for name in names:
+		path = ctypes.util.find_library(name) or name
+		try:
+			return ctypes.CDLL(path)
+		except OSError:
+			continue
+	return None
+
+
+_ESPEAK_SYNTH_CALLBACK = ctypes.CFUNCTYPE(
+	ctypes.c_int,
+	ctypes.POINTER(ctypes.c_short),
+	ctypes.c_int,
+	ctypes.c_void_p,
+)
+
+
+class _LibEspeakEngine:
+	"""Synthesizes speech in-process through libespeak-ng.
+
+	The library is initialized once so voice data stays loaded; rate and pitch
+	are set per utterance. Audio is rendered to PCM and handed to the player.
+	"""
+
+	name = "libespeak-ng"
+	can_play_pcm = True
+
+	_AUDIO_OUTPUT_SYNCHRONOUS = 2
+	_INITIALIZE_DONT_EXIT = 0x8000
+	_PARAM_RATE = 1
+	_PARAM_PITCH = 3
+	_POS_CHARACTER = 1
+	_CHARS_UTF8 = 1
+
+	def __init__(self, library, player):
+		self._lib = library
+		self._player = player
+		self._lock = threading.Lock()
+		self._chunks: list[bytes] = []
+		self._first_chunk_time = 0.0
+		self._voice = ""
+		self._declare_prototypes(library)
+
+		self.sample_rate = library.espeak_Initialize(
+			self._AUDIO_OUTPUT_SYNCHRONOUS, 0, None, self._INITIALIZE_DONT_EXIT
+		)
+		if self.sample_rate <= 0:
+			raise OSError("espeak_Initialize failed")
+
+		# Keep a reference so ctypes does not free the trampoline
+		self._callback = _ESPEAK_SYNTH_CALLBACK(self._on_samples)
+		library.espeak_SetSynthCallback(self._callback)
+		self._select_voice(DEFAULT_VOICE)
+
+	@staticmethod
+	def _declare_prototypes(library):
+		library.espeak_Initialize.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int]
+		library.espeak_Initialize.restype = ctypes.c_int
+		library.espeak_SetSynthCallback.argtypes = [_ESPEAK_SYNTH_CALLBACK]
+		library.espeak_SetSynthCallback.restype = None
+		library.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+		library.espeak_SetVoiceByName.restype = ctypes.c_int
+		library.espeak_SetParameter.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+		library.espeak_SetParameter.restype = ctypes.c_int
+		library.espeak_Synth.argtypes = [
+			ctypes.c_void_p,
+			ctypes.c_size_t,
+			ctypes.c_uint,
+			ctypes.c_int,
+			ctypes.c_uint,
+			ctypes.c_uint,
+			ctypes.POINTER(ctypes.c_uint),
+			ctypes.c_void_p,
+		]
+		library.espeak_Synth.restype = ctypes.c_int
+		library.espeak_Synchronize.argtypes = []
+		library.espeak_Synchronize.restype = ctypes.c_int
+		library.espeak_Terminate.argtypes = []
+		library.espeak_Terminate.restype = ctypes.c_int
+
+	def _on_samples(self, wav, num_samples, events):
+		if wav and num_samples > 0:
+			if not self._chunks:
+				self._first_chunk_time = time.perf_counter()
+			self._chunks.append(ctypes.string_at(wav, num_samples * 2))
+		return 0
+
+	def _select_voice(self, voice: str):
+		voice = voice or DEFAULT_VOICE
+		if voice == self._voice:
+			return
+		if self._lib.espeak_SetVoiceByName(voice.encode("utf-8")) != 0:
+			raise ValueError(f"unknown espeak-ng voice '{voice}'")
+		self._voice = voice
+
+	def render(self, speak_text: str, rate: int, pitch: int, voice: str = "") -> _PcmAudio:
+		encoded = speak_text.encode("utf-8")
+		text_buffer = ctypes.create_string_buffer(encoded)
+		with self._lock:
+			self._select_voice(voice)
+			self._lib.espeak_SetParameter(self._PARAM_RATE, int(rate), 0)
+			self._lib.espeak_SetParameter(self._PARAM_PITCH, int(pitch), 0)
+			self._chunks = []
+			result = self._lib.espeak_Synth(
+				text_buffer,
+				len(encoded) + 1,
+				0,
+				self._POS_CHARACTER,
+				0,
+				self._CHARS_UTF8,
+				None,
+				None,
+			)
+			if result != 0:
+				raise RuntimeError(f"espeak_Synth failed with code {result}")
+			self._lib.espeak_Synchronize()
+			samples = b"".join(self._chunks)
+			self._chunks = []
+		return _PcmAudio(samples, self.sample_rate)
+
+	def speak(self, speak_text: str, rate: int, pitch: int, voice: str = ""):
+		self._player.play(self.render(speak_text, rate, pitch, voice))
+
+	def play(self, audio: _PcmAudio):
+		self._player.play(audio)
+
+	def cancel(self):
+		self._player.cancel()
+
+	def clear_cancel(self):
+		self._player.clear_cancel()
+
+	def close(self):
+		with self._lock:
+			self._lib.espeak_Terminate()
+		self._player.close()
+
+
+class _PaSampleSpec(ctypes.Structure):
+	_fields_ = [
+		("format", ctypes.c_int),
+		("rate", ctypes.c_uint32),
+		("channels", ctypes.c_uint8),
+	]
+
+
+class _PaBufferAttr(ctypes.Structure):
+	_fields_ = [
+		("maxlength", ctypes.c_uint32),
+		("tlength", ctypes.c_uint32),
+		("prebuf", ctypes.c_uint32),
+		("minreq", ctypes.c_uint32),
+		("fragsize", ctypes.c_uint32),
+	]
+
+
+class _PulseAudioPlayer:
+	"""Plays 16-bit mono PCM through a persistent libpulse-simple stream.
+
+	The server-side buffer is kept to about _BUFFER_SECONDS so writes pace
+	playback and cancel() can cut an utterance off within that time.
+	"""
+
+	_STREAM_PLAYBACK = 1
+	_SAMPLE_S16LE = 3
+	_CHUNK_SECONDS = 0.05
+	_BUFFER_SECONDS = 0.1
+	_DRAIN_POLL_SECONDS = 0.01
+	_DEFAULT_ATTR = 0xFFFFFFFF
+	_INVALID_LATENCY = 0xFFFFFFFFFFFFFFFF
+
+	def __init__(self, library):
+		self._lib = library
+		self._stream = None
+		self._stream_rate = 0
+		self._lock = threading.Lock()
+		self._cancelled = threading.Event()
+
+		library.pa_simple_new.argtypes = [
+			ctypes.c_char_p,
+			ctypes.c_char_p,
+			ctypes.c_int,
+			ctypes.c_char_p,
+			ctypes.c_char_p,
+			ctypes.POINTER(_PaSampleSpec),
+			ctypes.c_void_p,
+			ctypes.POINTER(_PaBufferAttr),
+			ctypes.POINTER(ctypes.c_int),
+		]
+		library.pa_simple_new.restype = ctypes.c_void_p
+		library.pa_simple_write.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_int)]
+		library.pa_simple_write.restype = ctypes.c_int
+		library.pa_simple_drain.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+		library.pa_simple_drain.restype = ctypes.c_int
+		library.pa_simple_flush.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+		library.pa_simple_flush.restype = ctypes.c_int
+		library.pa_simple_get_latency.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int)]
+		library.pa_simple_get_latency.restype = ctypes.c_uint64
+		library.pa_simple_free.argtypes = [ctypes.c_void_p]
+		library.pa_simple_free.restype = None
+
+	def _ensure_stream(self, sample_rate: int):
+		if self._stream is not None and self._stream_rate == sample_rate:
+			return
+		self._free_stream()
+		spec = _PaSampleSpec(self._SAMPLE_S16LE, sample_rate, 1)
+		# A small target length instead of PulseAudio's ~2 s default buffer
+		attr = _PaBufferAttr(
+			self._DEFAULT_ATTR,
+			int(sample_rate * self._BUFFER_SECONDS) * 2,
+			self._DEFAULT_ATTR,
+			self._DEFAULT_ATTR,
+			self._DEFAULT_ATTR,
+		)
+		error = ctypes.c_int(0)
+		stream = self._lib.pa_simple_new(
+			None,
+			b"OBS Twitch TTS",
+			self._STREAM_PLAYBACK,
+			None,
+			b"chat speech",
+			ctypes.byref(spec),
+			None,
+			ctypes.byref(attr),
+			ctypes.byref(error),
+		)
+		if not stream:
+			raise OSError(f"pa_simple_new failed with code {error.value}")
+		self._stream = stream
+		self._stream_rate = sample_rate
+
+	def _free_stream(self):
+		if self._stream is not None:
+			self._lib.pa_simple_free(self._stream)
+		self._stream = None
+		self._stream_rate = 0
+
+	def cancel(self):
+		self._cancelled.set()
+
+	def clear_cancel(self):
+		# Called when a new message starts, before it is rendered, so a skip
+		# pressed while rendering still stops its playback
+		self._cancelled.clear()
+
+	def play(self, audio: _PcmAudio):
+		if not audio.samples:
+			return
+		with self._lock:
+			self._ensure_stream(audio.sample_rate)
+			error = ctypes.c_int(0)
+			chunk_bytes = max(2, int(audio.sample_rate * self._CHUNK_SECONDS) * 2)
+			view = memoryview(audio.samples)
+			for offset in range(0, len(view), chunk_bytes):
+				if self._cancelled.is_set():
+					self._flush()
+					return
+				chunk = view[offset : offset + chunk_bytes]
+				buffer = (ctypes.c_char * len(chunk)).from_buffer_copy(chunk)
+				if self._lib.pa_simple_write(self._stream, buffer, len(chunk), ctypes.byref(error)) < 0:
+					self._free_stream()
+					raise OSError(f"pa_simple_write failed with code {error.value}")
+			# Wait out the buffered tail in short steps instead of a blocking drain
+			while True:
+				latency = self._lib.pa_simple_get_latency(self._stream, ctypes.byref(error))
+				if latency == self._INVALID_LATENCY or latency <= self._DRAIN_POLL_SECONDS * 1_000_000:
+					break
+				if self._cancelled.wait(min(latency / 1_000_000, self._DRAIN_POLL_SECONDS)):
+					self._flush()
+					return
+			self._lib.pa_simple_drain(self._stream, ctypes.byref(error))
+
+	def _flush(self):
+		# Drop whatever is still buffered instead of draining it
+		error = ctypes.c_int(0)
+		self._lib.pa_simple_flush(self._stream, ctypes.byref(error))
+
+	def close(self):
+		# Stop a message that is still playing so the lock is released promptly
+		self._cancelled.set()
+		with self._lock:
+			self._free_stream()
+
+
+class _SubprocessEngine:
+	"""Runs one espeak-ng process per message; used when libespeak-ng is missing."""
+
+	name = "espeak-ng subprocess"
+
+	def __init__(self, player_command: Optional[list[str]] = None):
+		self._player_command = player_command
+		self.can_play_pcm = player_command is not None
+
+	def speak(self, speak_text: str, rate: int, pitch: int, voice: str = ""):
+		_process_supervisor.run(_espeak_command(speak_text, rate, pitch, voice), _ProcessSupervisor.PLAYBACK)
+
+	def cancel(self):
+		_process_supervisor.terminate(_ProcessSupervisor.PLAYBACK)
+
+	def clear_cancel(self):
+		pass
+
+	def render(self, speak_text: str, rate: int, pitch: int, voice: str = "") -> _PcmAudio:
+		command = _espeak_command(speak_text, rate, pitch, voice)
+		command.insert(1, "--stdout")
+		output = _process_supervisor.run(command, _ProcessSupervisor.RENDER, capture_output=True)
+		return _pcm_from_wav(output)
+
+	def play(self, audio: _PcmAudio):
+		if not audio.samples or self._player_command is None:
+			return
+		command = [part.format(rate=audio.sample_rate) for part in self._player_command]
+		_process_supervisor.run(command, _ProcessSupervisor.PLAYBACK, input_data=audio.samples)
+
+	def close(self):
+		pass
+
+
+class _ProcessSupervisor:
+	"""Tracks espeak-ng and player child processes so they can be stopped at once.
+
+	Each child runs in its own session. terminate() signals the whole process
+	group and escalates to SIGKILL if it has not exited within a few
+	milliseconds, so unloading the script never waits on running audio.
+	"""
+
+	PLAYBACK = "playback"
+	RENDER = "render"
+	ALL = ""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._children: dict[subprocess.Popen, str] = {}
+
+	def run(
+		self,
+		command: list[str],
+		role: str,
+		input_data: Optional[bytes] = None,
+		capture_output: bool = False,
+	) -> bytes:
+		process = subprocess.Popen(
+			command,
+			stdin=subprocess.PIPE if input_data is not None else subprocess.DEVNULL,
+			stdout=subprocess.PIPE if capture_output else None,
+			stderr=subprocess.DEVNULL if capture_output else None,
+			start_new_session=True,
+		)
+		with self._lock:
+			self._children[process] = role
+		try:
+			output, _ = process.communicate(input_data)
+		except BrokenPipeError:
+			process.wait()
+			output = b""
+		finally:
+			with self._lock:
+				self._children.pop(process, None)
+		return output or b""
+
+	def terminate(self, role: str):
+		with self._lock:
+			targets = [process for process, child_role in self._children.items() if not role or child_role == role]
+
+		for process in targets:
+			self._signal(process, signal.SIGTERM)
+		deadline = time.monotonic() + CHILD_KILL_GRACE_SECONDS
+		for process in targets:
+			try:
+				process.wait(timeout=max(0.0, deadline - time.monotonic()))
+			except subprocess.TimeoutExpired:
+				self._signal(process, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+	@staticmethod
+	def _signal(process: subprocess.Popen, signal_number: int):
+		if process.poll() is not None:
+			return
+		try:
+			os.killpg(process.pid, signal_number)
+		except (AttributeError, OSError):
+			# No process groups here; signal the child directly
+			try:
+				process.send_signal(signal_number)
+			except OSError:
+				pass
+
+
+_process_supervisor = _ProcessSupervisor()
+
+
+def _espeak_command(speak_text: str, rate: int, pitch: int, voice: str = "") -> list[str]:
+	command = [
+		"espeak-ng",
+		"-s",
+		str(rate),
+		"-p",
+		str(pitch),
+	]
+	if voice:
+		command.extend(["-v", voice])
+	command.append(speak_text)
+	return command
+
+
+def _pcm_from_wav(data: bytes) -> _PcmAudio:
+	if not data:
+		return _PcmAudio(b"", 22050)
+	with wave.open(io.BytesIO(data), "rb") as reader:
+		sample_rate = reader.getframerate()
+		# espeak-ng streams to stdout with a placeholder length, so read to EOF
+		samples = reader.readframes(len(data))
+	return _PcmAudio(samples, sample_rate)
 
 
 def script_save(settings):
-	# Make sure OBS keeps the current settings values
-	pass
+	# Make sure OBS keeps the current settings values and hotkey bindings
+	for name, hotkey_id in _hotkey_ids.items():
+		hotkey_array = obs.obs_hotkey_save(hotkey_id)
+		obs.obs_data_set_array(settings, name, hotkey_array)
+		obs.obs_data_array_release(hotkey_array)
+
+
+def _register_hotkeys(settings):
+	hotkeys = (
+		(HOTKEY_SKIP, "Twitch TTS: Skip current message", _on_skip_hotkey),
+		(HOTKEY_FLUSH, "Twitch TTS: Clear message queue", _on_flush_hotkey),
+	)
+	for name, description, callback in hotkeys:
+		hotkey_id = obs.obs_hotkey_register_frontend(name, description, callback)
+		hotkey_array = obs.obs_data_get_array(settings, name)
+		obs.obs_hotkey_load(hotkey_id, hotkey_array)
+		obs.obs_data_array_release(hotkey_array)
+		_hotkey_ids[name] = hotkey_id
+
+
+def _unregister_hotkeys():
+	for hotkey_id in _hotkey_ids.values():
+		obs.obs_hotkey_unregister(hotkey_id)
+	_hotkey_ids.clear()
+
+
+def _on_skip_hotkey(pressed):
+	if pressed:
+		skip_current_message()
+
+
+def _on_flush_hotkey(pressed):
+	if pressed:
+		flush_speech_queue()
+
+
+def skip_current_message():
+	# Cut off whatever is being spoken right now; the queue keeps going
+	if _speech_process.running:
+		_speech_process.send("skip")
+		return
+	_tts_worker.cancel_current()
+	_process_supervisor.terminate(_process_supervisor.PLAYBACK)
+
+
+def flush_speech_queue():
+	# Drop everything queued and stop the current message
+	if _speech_process.running:
+		_speech_process.send("flush")
+		return
+	_drain_queue()
+	skip_current_message()
+	obs.script_log(obs.LOG_INFO, "Speech queue cleared")
 
 
 def _maybe_apply_config():
@@ -723,8 +4249,7 @@ def _maybe_apply_config():
 	if _pending_config is None:
 		return
 
-	delay = 0.0 if _pending_force else 0.75
-	if time.time() - _pending_apply_time < delay:
+	if time.time() - _pending_apply_time < _pending_config_delay():
 		return
 
 	config = _pending_config
@@ -734,6 +4259,10 @@ def _maybe_apply_config():
 	_apply_config(config, force)
 
 
+def _pending_config_delay() -> float:
+	return 0.0 if _pending_force else CONFIG_APPLY_DELAY
+
+
 def _apply_config(config: dict, force: bool):
 	global _current_config
 
@@ -741,8 +4270,7 @@ def _apply_config(config: dict, force: bool):
 		stop_chat_thread()
 		stop_tts_thread()
 		_drain_queue()
-		_user_last_trigger.clear()
-		_user_last_greet.clear()
+		_clear_cooldowns()
 		_set_display_visibility(False)
 		_current_config = config
 		return
@@ -751,24 +4279,49 @@ def _apply_config(config: dict, force: bool):
 		obs.script_log(obs.LOG_WARNING, "Twitch channel is not set; enable after configuring it.")
 		stop_chat_thread()
 		_drain_queue()
-		_user_last_trigger.clear()
-		_user_last_greet.clear()
+		_clear_cooldowns()
 		_set_display_visibility(False)
 		_current_config = config
 		return
 
+	changed = _changed_config_keys(_current_config, config)
 	needs_restart = (
 		force
-		or config != _current_config
-		or not _chat_thread
-		or not _chat_thread.is_alive()
+		or not _is_chat_running()
+		or not changed.isdisjoint(_CONNECTION_CONFIG_KEYS)
 	)
 	_current_config = config
-	_user_last_trigger.clear()
-	_user_last_greet.clear()
 
 	if needs_restart:
+		_configure_channels()
+		_clear_cooldowns()
 		restart_chat_thread()
+		# The exporter moves between OBS and the speech process with the pipeline
+		_configure_metrics()
+		return
+
+	if _speech_process.running:
+		_speech_process.send("settings", _speech_process_settings())
+	if changed:
+		_apply_runtime_config(changed)
+
+
+def _changed_config_keys(previous: Optional[dict], config: dict) -> frozenset:
+	if previous is None:
+		return frozenset(config)
+	return frozenset(key for key in config.keys() | previous.keys() if previous.get(key) != config.get(key))
+
+
+def _apply_runtime_config(changed: frozenset):
+	# script_update already published the new values; queue and cooldowns stay
+	# intact. Trigger words are recompiled here, once the edit has settled.
+	_configure_channels()
+	if not changed.isdisjoint(("speech_rate", "pitch_min", "pitch_max")):
+		# Look-ahead audio rendered with the old rate or pitch would never be used
+		with _prerendered_lock:
+			_prerendered.clear()
+	_request_prefetch()
+	obs.script_log(obs.LOG_INFO, f"Applied {', '.join(sorted(changed))} without reconnecting")
 
 
 def _prepare_display(display_text: str):
@@ -781,6 +4334,9 @@ def _prepare_display(display_text: str):
 def _set_text_source_text(display_text: str):
 	if not text_source_name:
 		return
+	if _host_connection is not None:
+		_send_to_host("text", display_text)
+		return
 
 	source = obs.obs_get_source_by_name(text_source_name)
 	if source is None:
@@ -801,8 +4357,11 @@ def _set_display_visibility(visible: bool):
 	global _display_visible
 
 	target_visible = bool(visible)
-	_apply_visibility_to_source(text_source_name, target_visible)
-	_apply_visibility_to_source(image_source_name, target_visible)
+	if _host_connection is not None:
+		_send_to_host("visible", target_visible)
+	else:
+		_apply_visibility_to_source(text_source_name, target_visible)
+		_apply_visibility_to_source(image_source_name, target_visible)
 	_display_visible = target_visible and bool(text_source_name or image_source_name)
 
 
@@ -810,11 +4369,39 @@ def _apply_visibility_to_source(source_name: str, visible: bool):
 	if not source_name:
 		return
 
-	source = obs.obs_get_source_by_name(source_name)
-	if source is None:
-		return
+	for item in _scene_item_index.items_for(source_name):
+		obs.obs_sceneitem_set_visible(item, visible)
+
+
+class _SceneItemIndex:
+	"""Maps source names to the scene items that show them.
+
+	Built on first use by walking every scene once. Scene item add/remove
+	signals, source renames and frontend scene list or collection changes
+	mark it stale, and the next lookup rebuilds it, so a visibility toggle
+	only touches the items of that source.
+	"""
+
+	def __init__(self):
+		self._items: dict[str, list] = {}
+		self._scene_sources: list = []
+		self._stale = True
+		self.closed = False
+
+	def mark_stale(self):
+		self._stale = True
+
+	def items_for(self, source_name: str) -> list:
+		if self.closed:
+			return []
+		if self._stale:
+			self._rebuild()
+		return self._items.get(source_name, ())
+
+	def _rebuild(self):
+		self.release()
+		self._stale = False
 
-	try:
 		scenes = obs.obs_frontend_get_scenes()
 		if scenes is None:
 			return
@@ -824,36 +4411,81 @@ def _apply_visibility_to_source(source_name: str, visible: bool):
 				scene = obs.obs_scene_from_source(scene_source)
 				if scene is None:
 					continue
-				_set_source_visibility_in_scene(scene, source_name, visible)
+				self._watch_scene(scene_source)
+				self._index_scene(scene)
 		finally:
 			obs.source_list_release(scenes)
-	finally:
-		obs.obs_source_release(source)
 
+	def _watch_scene(self, scene_source):
+		scene_ref = obs.obs_source_get_ref(scene_source)
+		if scene_ref is None:
+			return
+		handler = obs.obs_source_get_signal_handler(scene_ref)
+		obs.signal_handler_connect(handler, "item_add", _on_scene_items_changed)
+		obs.signal_handler_connect(handler, "item_remove", _on_scene_items_changed)
+		self._scene_sources.append(scene_ref)
+
+	def _index_scene(self, scene):
+		items = obs.obs_scene_enum_items(scene)
+		if items is None:
+			return
 
-def _set_source_visibility_in_scene(scene, source_name: str, visible: bool):
-	items = obs.obs_scene_enum_items(scene)
-	if items is None:
-		return
+		try:
+			for item in items:
+				item_source = obs.obs_sceneitem_get_source(item)
+				if item_source is None:
+					continue
+				name = obs.obs_source_get_name(item_source)
+				if not name:
+					continue
+				obs.obs_sceneitem_addref(item)
+				self._items.setdefault(name, []).append(item)
+		finally:
+			obs.sceneitem_list_release(items)
+
+	def release(self):
+		# Drop every held reference; signal callbacks only ever mark the index stale
+		for scene_items in self._items.values():
+			for item in scene_items:
+				obs.obs_sceneitem_release(item)
+		self._items = {}
+
+		for scene_ref in self._scene_sources:
+			handler = obs.obs_source_get_signal_handler(scene_ref)
+			obs.signal_handler_disconnect(handler, "item_add", _on_scene_items_changed)
+			obs.signal_handler_disconnect(handler, "item_remove", _on_scene_items_changed)
+			obs.obs_source_release(scene_ref)
+		self._scene_sources = []
+		self._stale = True
+
+
+_scene_item_index = _SceneItemIndex()
 
-	try:
-		for item in items:
-			item_source = obs.obs_sceneitem_get_source(item)
-			if item_source is None:
-				continue
-			if obs.obs_source_get_name(item_source) == source_name:
-				obs.obs_sceneitem_set_visible(item, visible)
-			child_scene = obs.obs_scene_from_source(item_source)
-			if child_scene is not None:
-				_set_source_visibility_in_scene(child_scene, source_name, visible)
-	finally:
-		obs.sceneitem_list_release(items)
+
+def _on_scene_items_changed(calldata):
+	_scene_item_index.mark_stale()
+
+
+def _on_frontend_event(event):
+	if event in (
+		obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP,
+		obs.OBS_FRONTEND_EVENT_EXIT,
+	):
+		# Let go of scene items before OBS tears the collection down
+		_scene_item_index.release()
+		if event == obs.OBS_FRONTEND_EVENT_EXIT:
+			_scene_item_index.closed = True
+	elif event in (
+		obs.OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED,
+		obs.OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED,
+	):
+		_scene_item_index.mark_stale()
 
 
 def _update_display_visibility_after_tts():
 	if not _display_visible:
 		return
-	if _tts_thread is not None and _tts_thread.is_alive():
+	if _is_speaking():
 		return
 	if not _message_queue.empty():
 		return
@@ -891,7 +4523,7 @@ def _on_enabled_modified(props, prop, settings):
 
 
 def _set_config_properties_enabled(props, enabled_state: bool):
-	for name in _CONFIG_PROPERTY_NAMES:
+	for name in _CONNECTION_PROPERTY_NAMES:
 		target = obs.obs_properties_get(props, name)
 		if target is not None:
 			obs.obs_property_set_enabled(target, enabled_state)
@@ -918,3 +4550,7 @@ def _espeak_pitch_value(pitch_value: int) -> int:
 
 	espeak_value = espeak_min + ratio * (espeak_max - espeak_min)
 	return int(round(espeak_value))
+
+
+if __name__ == SPEECH_PROCESS_RUN_NAME:
+	_run_speech_process(*_SPEECH_PROCESS_ARGS)
@@ -0,0 +1,25 @@
+"""
+Imports text-2-espeak.py with the obspython stub so tools can drive it headless
+"""
+
+import importlib.util
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPT_DIR = os.path.dirname(TOOLS_DIR)
+SCRIPT_PATH = os.path.join(SCRIPT_DIR, "text-2-espeak.py")
+MODULE_NAME = "text-2-espeak"
+
+
+def load_script():
+	if TOOLS_DIR not in sys.path:
+		sys.path.insert(0, TOOLS_DIR)
+	if MODULE_NAME in sys.modules:
+		return sys.modules[MODULE_NAME]
+
+	spec = importlib.util.spec_from_file_location(MODULE_NAME, SCRIPT_PATH)
+	module = importlib.util.module_from_spec(spec)
+	sys.modules[MODULE_NAME] = module
+	spec.loader.exec_module(module)
+	return module
@@ -0,0 +1,86 @@
+"""
+Simulates the cooldown tables over a long stream on a big channel
+
+Compares the previous plain-dict tables (entries only removed when the same
+user shows up again) with the expiring maps, using a simulated clock.
+
+Usage: python3 bench_cooldown_tables.py [--hours 8] [--joins 15] [--chatters 40]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from _script_loader import load_script
+
+
+class _DictTable:
+	# The previous behaviour: a dict that only drops a user when they return
+	def __init__(self):
+		self.entries = {}
+
+	def touch(self, key, timeout, now):
+		self.entries[key] = now
+
+	def is_active(self, key, timeout, now):
+		last = self.entries.get(key)
+		if last is None:
+			return False
+		if now - last >= timeout:
+			del self.entries[key]
+			return False
+		return True
+
+	def __len__(self):
+		return len(self.entries)
+
+
+def _simulate(greet_table, trigger_table, args) -> tuple[int, int, float]:
+	rng = random.Random(42)
+	greet_timeout = 10.0 * 60.0
+	trigger_timeout = 0.5
+	next_user = 0
+	tracemalloc.start()
+	start = time.perf_counter()
+	for second in range(int(args.hours * 3600)):
+		now = float(second)
+		for _ in range(args.joins):
+			# Most joins are new viewers; some are returning ones
+			if next_user and rng.random() < 0.2:
+				user = f"user{rng.randrange(next_user)}"
+			else:
+				user = f"user{next_user}"
+				next_user += 1
+			if not greet_table.is_active(user, greet_timeout, now):
+				greet_table.touch(user, greet_timeout, now)
+		for _ in range(args.chatters):
+			user = f"user{rng.randrange(max(1, next_user))}"
+			if not trigger_table.is_active(user, trigger_timeout, now):
+				trigger_table.touch(user, trigger_timeout, now)
+	elapsed = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return len(greet_table) + len(trigger_table), peak, elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--hours", type=float, default=8.0)
+	parser.add_argument("--joins", type=int, default=15, help="JOINs per second")
+	parser.add_argument("--chatters", type=int, default=40, help="chat messages per second")
+	args = parser.parse_args()
+
+	script = load_script()
+	limit = script.COOLDOWN_TABLE_MAX_ENTRIES
+	runs = (
+		("plain dicts", _DictTable(), _DictTable()),
+		("expiring maps", script._ExpiringMap(limit), script._ExpiringMap(limit)),
+	)
+	for label, greet_table, trigger_table in runs:
+		entries, peak, elapsed = _simulate(greet_table, trigger_table, args)
+		print(f"{label:<14} {entries:>9} entries at end  peak {peak / 1048576:8.1f} MB  {elapsed:6.1f} s")
+
+
+if __name__ == "__main__":
+	main()
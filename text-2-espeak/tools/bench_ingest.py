@@ -0,0 +1,91 @@
+"""
+Measures the chat ingest path end to end without OBS or Twitch
+
+Starts fake_twitch_server.py in this process, points the script at it through
+TEXT2ESPEAK_IRC_SERVER and loads it with the obspython stub, so the real
+socket, framer, parser, filters, trigger matching and queueing all run. It
+reports how fast received chat lines turn into queue decisions, the CPU time
+that took and where the queue ended up.
+
+Pass a log from record_irc.py to replay real traffic; without one a synthetic
+busy channel is generated. Speech dispatch is off unless --dispatch is given,
+so nothing is spoken and the queue sheds load by the overflow policy.
+
+Usage: python3 bench_ingest.py [log_file] [--speed max] [--messages N] [--trigger WORD] [--dispatch]
+"""
+
+import argparse
+import os
+import time
+
+import obspython
+from _script_loader import load_script
+from fake_twitch_server import FakeTwitchServer, _parse_speed, load_recording, synthetic_recording
+
+TICK_SECONDS = 0.01
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("log_file", nargs="?")
+	parser.add_argument("--speed", type=_parse_speed, default=0.0, help="1, 10 or max")
+	parser.add_argument("--messages", type=int, default=50000, help="synthetic messages without a log")
+	parser.add_argument("--trigger", default="")
+	parser.add_argument("--dispatch", action="store_true", help="run the OBS timers, speaking queued messages")
+	parser.add_argument("--timeout", type=float, default=120.0)
+	args = parser.parse_args()
+
+	entries = load_recording(args.log_file) if args.log_file else synthetic_recording(args.messages)
+	expected = sum(1 for _, line in entries if " PRIVMSG #" in line)
+	server = FakeTwitchServer(entries, speed=args.speed)
+	port = server.start()
+
+	obspython.quiet = True
+	os.environ["TEXT2ESPEAK_IRC_SERVER"] = f"127.0.0.1:{port}"
+	script = load_script()
+	settings = obspython.obs_data_create()
+	script.script_defaults(settings)
+	obspython.obs_data_set_string(settings, "channel", "bench")
+	obspython.obs_data_set_string(settings, "trigger_word", args.trigger)
+	obspython.obs_data_set_bool(settings, "enabled", True)
+
+	metrics = script._pipeline_metrics
+	cpu_start = time.process_time()
+	start = time.monotonic()
+	script.script_load(settings)
+	try:
+		deadline = start + args.timeout
+		# Timer ticks apply the settings and start the chat thread
+		while script._chat_connection is None and time.monotonic() < deadline:
+			time.sleep(TICK_SECONDS)
+			obspython.run_timers()
+		while metrics.snapshot()["counters"]["received"]["total"] < expected and time.monotonic() < deadline:
+			time.sleep(TICK_SECONDS)
+			if args.dispatch:
+				obspython.run_timers()
+		elapsed = time.monotonic() - start
+		cpu = time.process_time() - cpu_start
+		snapshot = metrics.snapshot()
+		connection = script._chat_connection
+		lines = connection.lines_received if connection is not None else server.lines_sent
+	finally:
+		script.script_unload()
+		server.stop()
+
+	counters = {name: values["total"] for name, values in snapshot["counters"].items()}
+	print(f"{server.lines_sent} lines replayed, {expected} chat messages, speed {args.speed or 'max'}")
+	print(f"  wall time        {elapsed:10.2f} s")
+	print(f"  CPU time         {cpu:10.2f} s (server thread included)")
+	print(f"  lines/s          {lines / elapsed:10.0f}")
+	print(f"  messages/s       {counters['received'] / elapsed:10.0f}")
+	print(f"  received         {counters['received']:10d}")
+	print(f"  queued           {counters['queued']:10d}")
+	print(f"  rejected         {counters['rejected']:10d}")
+	print(f"  dropped          {counters['dropped']:10d}")
+	print(f"  queue depth      {snapshot['queue_depth']:10d}")
+	if counters["received"] < expected:
+		print(f"  timed out after {args.timeout:g} s")
+
+
+if __name__ == "__main__":
+	main()
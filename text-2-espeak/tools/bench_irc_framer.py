@@ -0,0 +1,96 @@
+"""
+Replays a raw IRC dump through the old string framer and the buffer framer
+
+Pass a captured dump (raw bytes, CRLF line endings) to replay real traffic;
+without one a synthetic high-volume channel dump is generated.
+
+Usage: python3 bench_irc_framer.py [dump_file] [--repeat N]
+"""
+
+import argparse
+import time
+
+from _script_loader import load_script
+from fake_twitch_server import synthetic_recording
+
+
+def _synthetic_dump(line_count: int) -> bytes:
+	return "".join(f"{line}\r\n" for _, line in synthetic_recording(line_count)).encode("utf-8")
+
+
+class _ChunkedSocket:
+	# Hands out a byte string in chunks no larger than the caller's buffer
+	def __init__(self, data: bytes, chunk_size: int):
+		self._data = memoryview(data)
+		self._offset = 0
+		self._chunk_size = chunk_size
+
+	def recv(self, size: int) -> bytes:
+		size = min(size, self._chunk_size)
+		chunk = self._data[self._offset : self._offset + size]
+		self._offset += len(chunk)
+		return bytes(chunk)
+
+	def recv_into(self, buffer) -> int:
+		size = min(len(buffer), self._chunk_size)
+		chunk = self._data[self._offset : self._offset + size]
+		buffer[: len(chunk)] = chunk
+		self._offset += len(chunk)
+		return len(chunk)
+
+
+def _old_framer(sock, recv_size: int) -> int:
+	# The previous _listen_loop framing: decode per recv and split the tail
+	count = 0
+	partial = ""
+	while True:
+		data = sock.recv(recv_size)
+		if not data:
+			return count
+		partial += data.decode("utf-8", errors="ignore")
+		while "\r\n" in partial:
+			line, partial = partial.split("\r\n", 1)
+			count += 1
+
+
+def _new_framer(script, sock) -> int:
+	count = 0
+	framer = script._IrcLineFramer()
+	while framer.recv_from(sock):
+		count += len(framer.pop_lines())
+	return count
+
+
+def _measure(label: str, run, byte_count: int, repeat: int):
+	best = None
+	lines = 0
+	for _ in range(repeat):
+		start = time.perf_counter()
+		lines = run()
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	print(f"{label:<34} {lines:>9} lines {best * 1000.0:9.1f} ms {byte_count / best / 1048576:8.1f} MB/s")
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("dump", nargs="?")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--lines", type=int, default=200000)
+	args = parser.parse_args()
+
+	script = load_script()
+	if args.dump:
+		with open(args.dump, "rb") as handle:
+			data = handle.read()
+	else:
+		data = _synthetic_dump(args.lines)
+
+	size = script.RECV_BUFFER_SIZE
+	_measure("old framer, 2048 byte recv", lambda: _old_framer(_ChunkedSocket(data, 2048), 2048), len(data), args.repeat)
+	_measure(f"old framer, {size} byte recv", lambda: _old_framer(_ChunkedSocket(data, size), size), len(data), args.repeat)
+	_measure(f"buffer framer, {size} byte recv", lambda: _new_framer(script, _ChunkedSocket(data, size)), len(data), args.repeat)
+
+
+if __name__ == "__main__":
+	main()
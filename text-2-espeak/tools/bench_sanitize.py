@@ -0,0 +1,80 @@
+"""
+Compares the old per-character _sanitize_text with the translate-table version
+
+Pass a chat corpus to measure real traffic: either one message per line or a
+raw IRC dump (PRIVMSG lines are reduced to their message text). Without one a
+synthetic mix of English, accented, Cyrillic, CJK and emoji chat is generated;
+--ascii limits it to plain ASCII chat, which takes the sanitizer's fast path.
+
+Usage: python3 bench_sanitize.py [corpus_file] [--repeat N] [--ascii]
+"""
+
+import argparse
+import random
+import time
+
+from _script_loader import load_script
+
+
+def _old_sanitize_text(text: str) -> str:
+	filtered = ''.join(ch if 32 <= ord(ch) < 127 else ' ' for ch in text)
+	filtered = ' '.join(filtered.split())
+	return filtered.strip()
+
+
+ASCII_WORDS = ("pog", "lol", "gg", "KEKW", "that was insane", "hello chat", "W", "no way", "clip it")
+NON_ASCII_WORDS = ("José", "Zoë", "straße", "ça va", "привет", "日本語", "🎉", "😂😂😂", "Ærøskøbing", "“nice”")
+
+
+def _synthetic_corpus(count: int, ascii_only: bool) -> list[str]:
+	rng = random.Random(1234)
+	words = ASCII_WORDS if ascii_only else ASCII_WORDS + NON_ASCII_WORDS
+	return [" ".join(rng.choice(words) for _ in range(rng.randint(1, 12))) for _ in range(count)]
+
+
+def _load_corpus(path: str) -> list[str]:
+	messages = []
+	with open(path, encoding="utf-8", errors="replace") as handle:
+		for line in handle:
+			line = line.rstrip("\r\n")
+			if " PRIVMSG " in line:
+				line = line.split(" PRIVMSG ", 1)[1].partition(" :")[2]
+			if line:
+				messages.append(line)
+	return messages
+
+
+def _measure(label: str, sanitize, corpus: list[str], repeat: int):
+	best = None
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for text in corpus:
+			sanitize(text)
+		elapsed = time.perf_counter() - start
+		best = elapsed if best is None else min(best, elapsed)
+	kept = sum(len(sanitize(text)) for text in corpus)
+	print(f"{label:<32} {best * 1000.0:9.1f} ms {len(corpus) / best:12.0f} msg/s {kept:>10} chars kept")
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("corpus", nargs="?")
+	parser.add_argument("--repeat", type=int, default=5)
+	parser.add_argument("--messages", type=int, default=200000)
+	parser.add_argument("--ascii", action="store_true", help="generate ASCII-only chat")
+	args = parser.parse_args()
+
+	script = load_script()
+	corpus = _load_corpus(args.corpus) if args.corpus else _synthetic_corpus(args.messages, args.ascii)
+
+	_measure("old generator sanitizer", _old_sanitize_text, corpus, args.repeat)
+	script.transliterate_text = False
+	script._configure_sanitizer()
+	_measure("translate table", script._sanitize_text, corpus, args.repeat)
+	script.transliterate_text = True
+	script._configure_sanitizer()
+	_measure("translate table, transliterated", script._sanitize_text, corpus, args.repeat)
+
+
+if __name__ == "__main__":
+	main()
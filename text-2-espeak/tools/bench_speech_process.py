@@ -0,0 +1,96 @@
+"""
+Measures how much of the main interpreter a chat flood uses with chat and
+speech running in threads versus in the separate speech process
+
+A fake_twitch_server.py instance (in its own process) plays a busy Twitch
+channel at a fixed message rate. For each mode the benchmark reports the CPU
+time used by this process and how late a 10 ms main-thread timer fires, which
+is what other OBS scripts and UI callbacks feel under GIL contention.
+
+Queued messages are spoken if espeak-ng is installed; pass --trigger with a
+word no message starts with to keep the run silent (parsing and filtering
+still happen, queueing and synthesis do not).
+
+Usage: python3 bench_speech_process.py [--rate 100] [--seconds 10] [--trigger WORD]
+"""
+
+import argparse
+import multiprocessing
+import statistics
+import time
+
+import obspython
+from _script_loader import load_script
+from fake_twitch_server import FakeTwitchServer, synthetic_recording
+
+TICK_SECONDS = 0.01
+
+
+def _serve_chat(port_queue, rate: int, seconds: float):
+	# Busy channel at a fixed message rate; every connection replays it from the start
+	server = FakeTwitchServer(synthetic_recording(int(rate * seconds) + rate, rate), speed=1.0, loop=True)
+	port_queue.put(server.start())
+	while True:
+		time.sleep(1.0)
+
+
+def _configure(script, port: int, trigger: str, use_child_process: bool):
+	script.TWITCH_SERVER = "127.0.0.1"
+	script.TWITCH_PORT = port
+	script.channel = "#bench"
+	script.trigger_word = trigger
+	script.enabled = True
+	script.use_child_process = use_child_process
+	script._configure_channels()
+
+
+def _measure(script, label: str, seconds: float):
+	script.start_chat_thread()
+	lateness = []
+	cpu_start = time.process_time()
+	start = time.monotonic()
+	while time.monotonic() - start < seconds:
+		expected = time.monotonic() + TICK_SECONDS
+		time.sleep(TICK_SECONDS)
+		lateness.append(time.monotonic() - expected)
+		# Stand-in for the OBS timer callback
+		script._speech_process.pump()
+		script._run_main_work()
+	cpu = time.process_time() - cpu_start
+	script.stop_chat_thread()
+	script.stop_tts_thread()
+	script._drain_queue()
+
+	lateness.sort()
+	print(f"{label}:")
+	print(f"  main process CPU      {cpu:8.2f} s ({100.0 * cpu / seconds:5.1f}% of one core)")
+	print(f"  timer lateness median {statistics.median(lateness) * 1000.0:8.2f} ms")
+	print(f"  timer lateness p99    {lateness[int(len(lateness) * 0.99)] * 1000.0:8.2f} ms")
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--rate", type=int, default=100)
+	parser.add_argument("--seconds", type=float, default=10.0)
+	parser.add_argument("--trigger", default="")
+	args = parser.parse_args()
+
+	obspython.quiet = True
+	script = load_script()
+	port_queue = multiprocessing.Queue()
+	server = multiprocessing.Process(target=_serve_chat, args=(port_queue, args.rate, args.seconds), daemon=True)
+	server.start()
+	port = port_queue.get()
+
+	try:
+		print(f"{args.rate} messages/second for {args.seconds:.0f} s each")
+		_configure(script, port, args.trigger, use_child_process=False)
+		_measure(script, "threads in the main interpreter", args.seconds)
+		_configure(script, port, args.trigger, use_child_process=True)
+		_measure(script, "separate speech process", args.seconds)
+	finally:
+		server.terminate()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,86 @@
+"""
+Compares the libespeak-ng engine with the one-process-per-message fallback
+
+Reports synthesized messages per second and time-to-first-audio for each path.
+Audio is rendered, not played, so the numbers isolate synthesis cost.
+
+Usage: python3 bench_tts_engine.py [--messages N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import time
+
+from _script_loader import load_script
+
+MESSAGES = (
+	"hello chat",
+	"gg",
+	"Welcome somebody to the stream",
+	"that boss fight was absolutely wild, how did you survive with one hp left",
+	"lol",
+	"can you read this message out loud please",
+)
+
+
+def _subprocess_first_audio(script, text: str) -> float:
+	# Time until espeak-ng writes its first bytes of audio to stdout
+	command = script._espeak_command(text, 150, 50)
+	command.insert(1, "--stdout")
+	start = time.perf_counter()
+	process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+	process.stdout.read(1)
+	first = time.perf_counter() - start
+	process.stdout.read()
+	process.wait()
+	return first
+
+
+def _library_first_audio(engine, text: str) -> float:
+	start = time.perf_counter()
+	engine.render(text, 150, 50)
+	return engine._first_chunk_time - start
+
+
+def _run(label: str, first_audio, count: int):
+	first_times = []
+	start = time.perf_counter()
+	for index in range(count):
+		text = MESSAGES[index % len(MESSAGES)]
+		first_times.append(first_audio(text))
+	elapsed = time.perf_counter() - start
+
+	print(f"{label}:")
+	print(f"  messages/second      {count / elapsed:8.1f}")
+	print(f"  first audio median   {statistics.median(first_times) * 1000.0:8.2f} ms")
+	print(f"  first audio max      {max(first_times) * 1000.0:8.2f} ms")
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--messages", type=int, default=60)
+	args = parser.parse_args()
+
+	count = args.messages
+	script = load_script()
+
+	try:
+		_run("espeak-ng subprocess", lambda text: _subprocess_first_audio(script, text), count)
+	except FileNotFoundError:
+		print("espeak-ng subprocess: espeak-ng not found on PATH")
+
+	library = script._load_shared_library(script.ESPEAK_LIBRARY_NAMES)
+	if library is None:
+		print("libespeak-ng: library not found")
+		return
+
+	engine = script._LibEspeakEngine(library, player=None)
+	try:
+		_run("libespeak-ng", lambda text: _library_first_audio(engine, text), count)
+	finally:
+		engine._lib.espeak_Terminate()
+
+
+if __name__ == "__main__":
+	main()
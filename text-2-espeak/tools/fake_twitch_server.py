@@ -0,0 +1,321 @@
+"""
+Local IRC server that answers like Twitch chat and replays recorded traffic
+
+Answers the handshake the script sends (CAP, PASS, NICK, JOIN) and PINGs the
+way tmi.twitch.tv does, then replays a log written by record_irc.py to every
+client once it has joined. Without a log, synthetic chat is generated. Run it
+and point the script at it with TEXT2ESPEAK_IRC_SERVER=127.0.0.1:PORT, or use
+FakeTwitchServer from another tool.
+
+Recorded channels are renamed to the ones the client joined unless
+--keep-channel is given; gaps longer than --max-gap seconds are shortened.
+
+Usage: python3 fake_twitch_server.py [log_file] [--port 6667] [--speed 1|10|max] [--loop] [--ping-interval SECONDS]
+"""
+
+import argparse
+import gzip
+import random
+import socket
+import threading
+import time
+
+SERVER_NAME = "tmi.twitch.tv"
+REPLAYED_COMMANDS = {"PRIVMSG", "JOIN", "PART", "USERNOTICE", "CLEARCHAT", "CLEARMSG", "ROOMSTATE"}
+MAX_BATCH_LINES = 512
+
+
+def load_recording(path: str) -> list[tuple[float, str]]:
+	"""Reads a record_irc.py log (gzip or plain) as (seconds from start, line) pairs."""
+	with open(path, "rb") as handle:
+		compressed = handle.read(2) == b"\x1f\x8b"
+	opener = gzip.open if compressed else open
+	entries = []
+	with opener(path, "rt", encoding="utf-8", errors="replace") as handle:
+		for row in handle:
+			stamp, _, line = row.rstrip("\r\n").partition("\t")
+			if line and _command(line) in REPLAYED_COMMANDS:
+				entries.append((float(stamp), line))
+	if entries:
+		start = entries[0][0]
+		entries = [(stamp - start, line) for stamp, line in entries]
+	return entries
+
+
+def synthetic_recording(message_count: int, rate: float = 100.0) -> list[tuple[float, str]]:
+	"""A busy channel: PRIVMSGs at the given rate with a JOIN every 20 messages."""
+	rng = random.Random(1234)
+	words = ("pog", "lol", "gg", "KEKW", "that was insane", "hello chat", "W", "no way", "clip it")
+	entries = []
+	for index in range(message_count):
+		stamp = index / rate
+		user = f"viewer{rng.randrange(50000)}"
+		if index % 20 == 0:
+			entries.append((stamp, f":{user}!{user}@{user}.tmi.twitch.tv JOIN #recorded"))
+		text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+		tags = (
+			f"@badge-info=;badges=subscriber/12;color=#1E90FF;display-name={user};emotes=;"
+			f"id={index:08x}-0000-0000-0000-000000000000;mod=0;room-id=12345;subscriber=1;"
+			f"tmi-sent-ts={1700000000000 + index};turbo=0;user-id={rng.randrange(10**9)};user-type="
+		)
+		entries.append((stamp, f"{tags} :{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #recorded :{text}"))
+	return entries
+
+
+def _split_line(line: str) -> tuple[str, str, list[str]]:
+	# Returns (text before the command, command, remaining words)
+	words = line.split(" ")
+	index = 0
+	while index < len(words) and words[index][:1] in ("@", ":"):
+		index += 1
+	if index >= len(words):
+		return line, "", []
+	return " ".join(words[:index]), words[index].upper(), words[index + 1 :]
+
+
+def _command(line: str) -> str:
+	return _split_line(line)[1]
+
+
+class FakeTwitchServer:
+	"""Serves each client on its own thread; start() returns the listening port."""
+
+	def __init__(
+		self,
+		entries: list[tuple[float, str]],
+		speed: float = 0.0,
+		loop: bool = False,
+		ping_interval: float = 0.0,
+		keep_channel: bool = False,
+		max_gap: float = 5.0,
+		host: str = "127.0.0.1",
+		port: int = 0,
+	):
+		# speed 0 replays as fast as the socket takes it
+		self.entries = entries
+		self.speed = speed
+		self.loop = loop
+		self.ping_interval = ping_interval
+		self.keep_channel = keep_channel
+		self.max_gap = max_gap
+		self.lines_sent = 0
+		self.replay_done = threading.Event()
+		self._address = (host, port)
+		self._listener: socket.socket | None = None
+		self._stopping = threading.Event()
+		self._clients: list[socket.socket] = []
+		self._lock = threading.Lock()
+
+	def start(self) -> int:
+		self._listener = socket.create_server(self._address)
+		self._listener.settimeout(0.2)
+		threading.Thread(target=self._accept_loop, name="fake-twitch-accept", daemon=True).start()
+		return self._listener.getsockname()[1]
+
+	def stop(self):
+		self._stopping.set()
+		with self._lock:
+			clients = list(self._clients)
+		for client in clients:
+			try:
+				client.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+			client.close()
+		if self._listener is not None:
+			self._listener.close()
+
+	def _accept_loop(self):
+		while not self._stopping.is_set():
+			try:
+				client, _ = self._listener.accept()
+			except socket.timeout:
+				continue
+			except OSError:
+				return
+			client.settimeout(None)
+			with self._lock:
+				self._clients.append(client)
+			threading.Thread(target=self._serve, args=(client,), name="fake-twitch-client", daemon=True).start()
+
+	def _serve(self, client: socket.socket):
+		session = _Session(self, client)
+		try:
+			session.run()
+		except OSError:
+			pass
+		finally:
+			session.closed.set()
+			with self._lock:
+				if client in self._clients:
+					self._clients.remove(client)
+			client.close()
+
+
+class _Session:
+	def __init__(self, server: FakeTwitchServer, client: socket.socket):
+		self.server = server
+		self.client = client
+		self.nickname = "justinfan"
+		self.channels: list[str] = []
+		self.closed = threading.Event()
+		self._send_lock = threading.Lock()
+		self._replaying = False
+
+	def send(self, *lines: str):
+		data = "".join(f"{line}\r\n" for line in lines).encode("utf-8")
+		with self._send_lock:
+			self.client.sendall(data)
+
+	def run(self):
+		if self.server.ping_interval > 0:
+			threading.Thread(target=self._ping_loop, daemon=True).start()
+		partial = b""
+		while not self.server._stopping.is_set():
+			data = self.client.recv(4096)
+			if not data:
+				return
+			*lines, partial = (partial + data).split(b"\r\n")
+			for raw in lines:
+				self._handle(raw.decode("utf-8", errors="replace"))
+
+	def _handle(self, line: str):
+		_, command, words = _split_line(line)
+		argument = " ".join(words)
+		if command == "CAP" and words[:1] == ["REQ"]:
+			capabilities = argument.partition(":")[2]
+			self.send(f":{SERVER_NAME} CAP * ACK :{capabilities}")
+		elif command == "NICK" and words:
+			self.nickname = words[0].lower()
+			nick = self.nickname
+			self.send(
+				f":{SERVER_NAME} 001 {nick} :Welcome, GLHF!",
+				f":{SERVER_NAME} 002 {nick} :Your host is {SERVER_NAME}",
+				f":{SERVER_NAME} 003 {nick} :This server is rather new",
+				f":{SERVER_NAME} 004 {nick} :-",
+				f":{SERVER_NAME} 375 {nick} :-",
+				f":{SERVER_NAME} 372 {nick} :You are in a maze of twisty passages, all alike.",
+				f":{SERVER_NAME} 376 {nick} :>",
+			)
+		elif command == "JOIN" and words:
+			nick = self.nickname
+			for channel in words[0].lower().split(","):
+				if channel in self.channels:
+					continue
+				self.channels.append(channel)
+				self.send(
+					f":{nick}!{nick}@{nick}.tmi.twitch.tv JOIN {channel}",
+					f":{nick}.tmi.twitch.tv 353 {nick} = {channel} :{nick}",
+					f":{nick}.tmi.twitch.tv 366 {nick} {channel} :End of /NAMES list",
+					f"@emote-only=0;followers-only=-1;r9k=0;room-id=12345;slow=0;subs-only=0 "
+					f":{SERVER_NAME} ROOMSTATE {channel}",
+				)
+			if not self._replaying:
+				self._replaying = True
+				threading.Thread(target=self._replay, daemon=True).start()
+		elif command == "PING":
+			self.send(f":{SERVER_NAME} PONG {SERVER_NAME} {argument or ':' + SERVER_NAME}")
+
+	def _ping_loop(self):
+		while not self.closed.wait(self.server.ping_interval):
+			try:
+				self.send(f"PING :{SERVER_NAME}")
+			except OSError:
+				return
+
+	def _rename_channels(self, entries: list[tuple[float, str]]) -> list[tuple[float, str]]:
+		# Recorded channels map onto the joined ones in order of first appearance
+		mapping: dict[str, str] = {}
+		renamed = []
+		for stamp, line in entries:
+			head, command, words = _split_line(line)
+			if words and words[0].startswith("#"):
+				if words[0] not in mapping:
+					mapping[words[0]] = self.channels[len(mapping) % len(self.channels)]
+				words[0] = mapping[words[0]]
+				line = " ".join([head, command, *words]) if head else " ".join([command, *words])
+			renamed.append((stamp, line))
+		return renamed
+
+	def _replay(self):
+		server = self.server
+		entries = server.entries if server.keep_channel else self._rename_channels(server.entries)
+		try:
+			while True:
+				self._replay_once(entries)
+				if not server.loop or self.closed.is_set():
+					break
+		except OSError:
+			pass
+		server.replay_done.set()
+
+	def _replay_once(self, entries: list[tuple[float, str]]):
+		server = self.server
+		if server.speed <= 0:
+			for start in range(0, len(entries), MAX_BATCH_LINES):
+				batch = [line for _, line in entries[start : start + MAX_BATCH_LINES]]
+				self.send(*batch)
+				server.lines_sent += len(batch)
+			return
+
+		# Replay clock: recorded offsets with long gaps shortened, divided by the speed
+		started = time.monotonic()
+		elapsed = 0.0
+		previous = entries[0][0] if entries else 0.0
+		index = 0
+		while index < len(entries):
+			if self.closed.is_set():
+				return
+			elapsed += min(entries[index][0] - previous, server.max_gap)
+			previous = entries[index][0]
+			delay = started + elapsed / server.speed - time.monotonic()
+			if delay > 0:
+				time.sleep(delay)
+			batch = [entries[index][1]]
+			index += 1
+			while index < len(entries) and entries[index][0] == previous and len(batch) < MAX_BATCH_LINES:
+				batch.append(entries[index][1])
+				index += 1
+			self.send(*batch)
+			server.lines_sent += len(batch)
+
+
+def _parse_speed(value: str) -> float:
+	if value == "max":
+		return 0.0
+	return float(value.rstrip("x"))
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("log_file", nargs="?")
+	parser.add_argument("--port", type=int, default=6667)
+	parser.add_argument("--speed", type=_parse_speed, default=1.0, help="1, 10 or max")
+	parser.add_argument("--loop", action="store_true")
+	parser.add_argument("--ping-interval", type=float, default=0.0)
+	parser.add_argument("--keep-channel", action="store_true")
+	parser.add_argument("--max-gap", type=float, default=5.0)
+	parser.add_argument("--messages", type=int, default=10000, help="synthetic messages without a log")
+	args = parser.parse_args()
+
+	entries = load_recording(args.log_file) if args.log_file else synthetic_recording(args.messages)
+	server = FakeTwitchServer(
+		entries,
+		speed=args.speed,
+		loop=args.loop,
+		ping_interval=args.ping_interval,
+		keep_channel=args.keep_channel,
+		max_gap=args.max_gap,
+		port=args.port,
+	)
+	port = server.start()
+	print(f"replaying {len(entries)} lines on 127.0.0.1:{port}; TEXT2ESPEAK_IRC_SERVER=127.0.0.1:{port}")
+	try:
+		while True:
+			time.sleep(1.0)
+	except KeyboardInterrupt:
+		server.stop()
+
+
+if __name__ == "__main__":
+	main()
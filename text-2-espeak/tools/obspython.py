@@ -0,0 +1,267 @@
+"""
+Minimal stand-in for OBS's obspython module
+
+Lets the tools in this folder import text-2-espeak.py outside of OBS and
+drive it through script_defaults/script_update/script_load. Settings live in
+plain dicts, timers only fire when run_timers() is called, and scene, source
+and hotkey functions do nothing.
+"""
+
+import sys
+import time
+
+LOG_ERROR = 100
+LOG_WARNING = 200
+LOG_INFO = 300
+LOG_DEBUG = 400
+
+OBS_TEXT_DEFAULT = 0
+OBS_TEXT_PASSWORD = 1
+OBS_TEXT_MULTILINE = 2
+OBS_PATH_FILE = 0
+OBS_PATH_FILE_SAVE = 1
+OBS_COMBO_TYPE_LIST = 2
+OBS_COMBO_FORMAT_STRING = 3
+
+OBS_FRONTEND_EVENT_SCENE_LIST_CHANGED = 4
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CHANGED = 8
+OBS_FRONTEND_EVENT_EXIT = 17
+OBS_FRONTEND_EVENT_SCENE_COLLECTION_CLEANUP = 20
+
+_LEVEL_NAMES = {
+	LOG_ERROR: "error",
+	LOG_WARNING: "warning",
+	LOG_INFO: "info",
+	LOG_DEBUG: "debug",
+}
+
+quiet = False
+
+
+def script_log(level, message):
+	if quiet:
+		return
+	print(f"[{_LEVEL_NAMES.get(level, level)}] {message}", file=sys.stderr)
+
+
+# Settings
+
+
+class _Data:
+	def __init__(self):
+		self.defaults = {}
+		self.values = {}
+
+	def get(self, name, fallback):
+		if name in self.values:
+			return self.values[name]
+		return self.defaults.get(name, fallback)
+
+
+def obs_data_create():
+	return _Data()
+
+
+def obs_data_release(data):
+	pass
+
+
+def obs_data_has_user_value(data, name):
+	return name in data.values
+
+
+def _setter(store):
+	def set_value(data, name, value):
+		getattr(data, store)[name] = value
+	return set_value
+
+
+obs_data_set_default_string = _setter("defaults")
+obs_data_set_default_int = _setter("defaults")
+obs_data_set_default_double = _setter("defaults")
+obs_data_set_default_bool = _setter("defaults")
+obs_data_set_string = _setter("values")
+obs_data_set_int = _setter("values")
+obs_data_set_double = _setter("values")
+obs_data_set_bool = _setter("values")
+obs_data_set_array = _setter("values")
+
+
+def obs_data_get_string(data, name):
+	return data.get(name, "")
+
+
+def obs_data_get_int(data, name):
+	return int(data.get(name, 0))
+
+
+def obs_data_get_double(data, name):
+	return float(data.get(name, 0.0))
+
+
+def obs_data_get_bool(data, name):
+	return bool(data.get(name, False))
+
+
+def obs_data_get_array(data, name):
+	return data.get(name, None)
+
+
+def obs_data_array_release(array):
+	pass
+
+
+# Properties: recorded so script_properties() can run, never shown
+
+
+class _Property:
+	def __init__(self, name):
+		self.name = name
+		self.enabled = True
+		self.items = []
+
+
+class _Properties(dict):
+	def add(self, name):
+		self[name] = _Property(name)
+		return self[name]
+
+
+def obs_properties_create():
+	return _Properties()
+
+
+def obs_properties_get(properties, name):
+	return properties.get(name)
+
+
+def obs_properties_add_text(properties, name, description, text_type):
+	return properties.add(name)
+
+
+def obs_properties_add_int(properties, name, description, minimum, maximum, step):
+	return properties.add(name)
+
+
+def obs_properties_add_float(properties, name, description, minimum, maximum, step):
+	return properties.add(name)
+
+
+def obs_properties_add_bool(properties, name, description):
+	return properties.add(name)
+
+
+def obs_properties_add_path(properties, name, description, path_type, filter_string, default_path):
+	return properties.add(name)
+
+
+def obs_properties_add_list(properties, name, description, combo_type, combo_format):
+	return properties.add(name)
+
+
+def obs_properties_add_button(properties, name, text, callback):
+	return properties.add(name)
+
+
+def obs_property_list_add_string(prop, name, value):
+	prop.items.append((name, value))
+
+
+def obs_property_set_enabled(prop, enabled):
+	prop.enabled = enabled
+
+
+def obs_property_set_modified_callback(prop, callback):
+	pass
+
+
+# Timers
+
+_timers = {}
+
+
+def timer_add(callback, milliseconds):
+	_timers[callback] = [milliseconds / 1000.0, time.monotonic() + milliseconds / 1000.0]
+
+
+def timer_remove(callback):
+	_timers.pop(callback, None)
+
+
+def run_timers():
+	# Fire every timer that is due; call this from the tool's own loop
+	now = time.monotonic()
+	for callback, timer in list(_timers.items()):
+		if callback in _timers and now >= timer[1]:
+			timer[1] = now + timer[0]
+			callback()
+
+
+# Hotkeys, signals and frontend callbacks
+
+_next_hotkey_id = 0
+
+
+def obs_hotkey_register_frontend(name, description, callback):
+	global _next_hotkey_id
+	_next_hotkey_id += 1
+	return _next_hotkey_id
+
+
+def obs_hotkey_unregister(hotkey_id):
+	pass
+
+
+def obs_hotkey_load(hotkey_id, array):
+	pass
+
+
+def obs_hotkey_save(hotkey_id):
+	return None
+
+
+def obs_frontend_add_event_callback(callback):
+	pass
+
+
+def obs_frontend_remove_event_callback(callback):
+	pass
+
+
+def obs_get_signal_handler():
+	return None
+
+
+def signal_handler_connect(handler, signal, callback):
+	pass
+
+
+def signal_handler_disconnect(handler, signal, callback):
+	pass
+
+
+# Sources and scenes: there are none outside OBS
+
+
+def obs_get_source_by_name(name):
+	return None
+
+
+def obs_source_release(source):
+	pass
+
+
+def obs_frontend_get_scenes():
+	return []
+
+
+def obs_enum_sources():
+	return []
+
+
+def source_list_release(sources):
+	pass
+
+
+def sceneitem_list_release(items):
+	pass
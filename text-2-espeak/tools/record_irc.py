@@ -0,0 +1,74 @@
+"""
+Records raw Twitch chat to a gzip log for fake_twitch_server.py to replay
+
+Connects anonymously (no token needed), joins the given channels with tags and
+membership enabled and writes every line the server sends as
+"<unix time>\t<raw line>", answering PINGs so long recordings stay connected.
+
+Usage: python3 record_irc.py CHANNEL [CHANNEL ...] [--out chat.log.gz] [--duration SECONDS]
+"""
+
+import argparse
+import gzip
+import random
+import socket
+import time
+
+TWITCH_SERVER = "irc.chat.twitch.tv"
+TWITCH_PORT = 6667
+
+
+def record(channels: list[str], out: str, duration: float) -> int:
+	channels = [channel if channel.startswith("#") else f"#{channel}" for channel in channels]
+	nickname = f"justinfan{random.randrange(10000, 99999)}"
+	sock = socket.create_connection((TWITCH_SERVER, TWITCH_PORT))
+	sock.settimeout(1.0)
+	sock.sendall(
+		(
+			"CAP REQ :twitch.tv/membership twitch.tv/tags\r\n"
+			"PASS SCHMOOPIIE\r\n"
+			f"NICK {nickname}\r\n"
+			f"JOIN {','.join(channels)}\r\n"
+		).encode("utf-8")
+	)
+
+	count = 0
+	partial = b""
+	deadline = time.monotonic() + duration if duration > 0 else None
+	with gzip.open(out, "wt", encoding="utf-8", newline="\n") as log:
+		try:
+			while deadline is None or time.monotonic() < deadline:
+				try:
+					data = sock.recv(65536)
+				except socket.timeout:
+					continue
+				if not data:
+					break
+				received_at = time.time()
+				*lines, partial = (partial + data).split(b"\r\n")
+				for raw in lines:
+					line = raw.decode("utf-8", errors="replace")
+					log.write(f"{received_at:.6f}\t{line}\n")
+					count += 1
+					if line.startswith("PING"):
+						sock.sendall(f"PONG{line[4:]}\r\n".encode("utf-8"))
+		except KeyboardInterrupt:
+			pass
+		finally:
+			sock.close()
+	return count
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("channels", nargs="+")
+	parser.add_argument("--out", default="chat.log.gz")
+	parser.add_argument("--duration", type=float, default=0.0, help="seconds to record, 0 until Ctrl+C")
+	args = parser.parse_args()
+
+	count = record(args.channels, args.out, args.duration)
+	print(f"{count} lines written to {args.out}")
+
+
+if __name__ == "__main__":
+	main()